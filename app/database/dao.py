@@ -1,7 +1,76 @@
-from sqlalchemy import select
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import Column, MetaData, Table, delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.models import User, Address, Company, Geo, Post, Comment, Photo, Album, Todo
+from app.database.locks import lock_key
+from app.database.models import User, Address, Company, Geo, Post, Comment, Photo, Album, Todo, HttpCache, SyncJob
+from app.services.config import load_config
+
+
+config = load_config()
+
+DEFAULT_BATCH_SIZE = config.db_batch_size
+DEFAULT_CLEAR_MODE = config.db_clear_mode
+DEFAULT_SYNC_MODE = config.sync_mode
+# asyncpg не принимает больше 32767 параметров в одном запросе.
+MAX_QUERY_PARAMS = 32767
+# Сколько переключение staging-таблицы может ждать блокировку живой таблицы.
+SWAP_LOCK_TIMEOUT = '5s'
+
+
+def compute_content_hash(row: Dict[str, Any]) -> str:
+    """
+    Вычисляет хеш содержимого строки ресурса для определения изменений.
+
+    Параметры:
+        row (Dict[str, Any]): Строка ресурса (может содержать вложенные словари).
+
+    Возвращает:
+        str: Шестнадцатеричный дайджест содержимого.
+    """
+    payload = json.dumps(row, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+Rows = Union[List[Dict[str, Any]], AsyncIterable[List[Dict[str, Any]]]]
+
+
+async def iter_chunks(rows: Rows) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Приводит строки ресурса к потоку пачек: список отдается одной пачкой,
+    асинхронный поток пачек (например, из DataStream.chunks) - как есть.
+
+    Параметры:
+        rows (Rows): Список строк или асинхронный поток пачек строк.
+
+    Возвращает:
+        AsyncIterator[List[Dict[str, Any]]]: Пачки строк.
+    """
+    if isinstance(rows, list):
+        yield rows
+        return
+    async for chunk in rows:
+        yield chunk
+
+
+@dataclass
+class SyncReport:
+    """
+    Итог синхронизации таблицы с данными API.
+    """
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def __str__(self):
+        return (f'добавлено: {self.inserted}, обновлено: {self.updated}, '
+                f'удалено: {self.deleted}, без изменений: {self.unchanged}')
 
 
 class BaseDAO:
@@ -11,14 +80,39 @@ class BaseDAO:
     Атрибуты:
         session (AsyncSession): Асинхронная сессия для взаимодействия с базой данных.
         model (Type): Модель базы данных, с которой работает DAO.
+        batch_size (int): Количество строк в одном многострочном INSERT.
+        clear_models (tuple): Модели, очищаемые вместе с основной, в порядке от дочерних к родительским.
 
     Методы:
         create(entity): Создает новую запись в базе данных.
-        delete_all(): Удаляет все записи из таблицы, связанной с моделью.
+        bulk_create(rows, batch_size, commit): Вставляет набор строк пачками в одной транзакции.
+        delete_all(mode, commit): Удаляет все записи из таблицы одним запросом DELETE или TRUNCATE.
+        replace_all(rows, batch_size, mode): Заменяет содержимое таблицы в одной транзакции.
+        sync(rows, batch_size): Применяет к таблице только изменения относительно данных API.
+        swap_all(rows, batch_size): Загружает данные в staging-таблицу и атомарно подменяет ею живую.
+        save_all(rows, sync_mode): Сохраняет данные ресурса выбранным способом.
     """
-    def __init__(self, session: AsyncSession, model):
+    clear_models: tuple = ()
+
+    def __init__(self, session: AsyncSession, model, batch_size: Optional[int] = None):
         self.session = session
         self.model = model
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+
+    def _batch_size(self, table, batch_size: Optional[int] = None) -> int:
+        return min(batch_size or self.batch_size, MAX_QUERY_PARAMS // len(table.columns))
+
+    def split_row(self, row: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Раскладывает строку ресурса по таблицам в порядке вставки (от родительских к дочерним).
+
+        Параметры:
+            row (Dict[str, Any]): Строка ресурса.
+
+        Возвращает:
+            Dict[Any, Dict[str, Any]]: Словарь {модель: строка таблицы}.
+        """
+        return {self.model: row}
 
     async def create(self, entity):
         self.session.add(entity)
@@ -26,30 +120,305 @@ class BaseDAO:
         await self.session.refresh(entity)
         return entity
 
-    async def delete_all(self):
-        query = select(self.model)
-        result = await self.session.execute(query)
-        entities = result.scalars().all()
-        for entity in entities:
-            await self.session.delete(entity)
+    async def bulk_create(
+            self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None, commit: bool = True, table=None
+    ) -> int:
+        """
+        Вставляет строки многострочными INSERT ... VALUES.
+
+        Параметры:
+            rows (List[Dict[str, Any]]): Строки в виде словарей {колонка: значение}.
+            batch_size (Optional[int]): Размер пачки, по умолчанию используется batch_size DAO.
+            commit (bool): Фиксировать ли транзакцию после вставки.
+            table (Optional[Table]): Таблица для вставки, по умолчанию таблица модели.
+
+        Возвращает:
+            int: Количество вставленных строк.
+        """
+        table = table if table is not None else self.model.__table__
+        batch_size = self._batch_size(table, batch_size)
+        for start in range(0, len(rows), batch_size):
+            await self.session.execute(insert(table).values(rows[start:start + batch_size]))
+        if commit:
+            await self.session.commit()
+        return len(rows)
+
+    async def upsert(self, model, rows: List[Dict[str, Any]], batch_size: Optional[int] = None):
+        """
+        Вставляет строки пачками через INSERT ... ON CONFLICT (первичный ключ) DO UPDATE.
+
+        Параметры:
+            model (Type): Модель таблицы, в которую выполняется запись.
+            rows (List[Dict[str, Any]]): Строки в виде словарей {колонка: значение}.
+            batch_size (Optional[int]): Размер пачки.
+        """
+        table = model.__table__
+        batch_size = self._batch_size(table, batch_size)
+        keys = [column.name for column in table.primary_key.columns]
+        for start in range(0, len(rows), batch_size):
+            statement = pg_insert(table).values(rows[start:start + batch_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=keys,
+                set_={column.name: statement.excluded[column.name]
+                      for column in table.columns if column.name not in keys}
+            )
+            await self.session.execute(statement)
+
+    async def delete_by_ids(self, ids: Iterable[int]) -> int:
+        """
+        Удаляет записи с указанными идентификаторами из таблицы модели и связанных таблиц.
+
+        Параметры:
+            ids (Iterable[int]): Идентификаторы удаляемых записей.
+
+        Возвращает:
+            int: Количество удаленных записей.
+        """
+        ids = list(ids)
+        for start in range(0, len(ids), MAX_QUERY_PARAMS):
+            chunk = ids[start:start + MAX_QUERY_PARAMS]
+            for model in self.clear_models or (self.model,):
+                key = next(iter(model.__table__.primary_key.columns))
+                await self.session.execute(delete(model).where(key.in_(chunk)))
+        return len(ids)
+
+    async def delete_all(self, mode: str = DEFAULT_CLEAR_MODE, commit: bool = True) -> Optional[int]:
+        """
+        Очищает таблицу модели и связанные с ней таблицы без загрузки объектов в сессию.
+
+        Параметры:
+            mode (str): 'delete' - DELETE FROM по каждой таблице, 'truncate' - один TRUNCATE.
+            commit (bool): Фиксировать ли транзакцию после очистки.
+
+        Возвращает:
+            Optional[int]: Количество удаленных записей основной таблицы (None для TRUNCATE).
+
+        Исключения:
+            ValueError: Если передан неизвестный режим очистки.
+        """
+        models = self.clear_models or (self.model,)
+        deleted = None
+        if mode == 'truncate':
+            tables = ', '.join(f'"{model.__tablename__}"' for model in models)
+            await self.session.execute(text(f'TRUNCATE TABLE {tables}'))
+        elif mode == 'delete':
+            for model in models:
+                result = await self.session.execute(delete(model))
+                if model is self.model:
+                    deleted = result.rowcount
+        else:
+            raise ValueError(f'Unknown clear mode: {mode}')
+        if commit:
+            await self.session.commit()
+        return deleted
+
+    async def replace_all(
+            self, rows: Rows, batch_size: Optional[int] = None, mode: str = DEFAULT_CLEAR_MODE
+    ) -> SyncReport:
+        """
+        Очищает таблицу и загружает новые строки в одной транзакции,
+        поэтому читатели до фиксации видят старые данные, а не пустую таблицу.
+
+        Параметры:
+            rows (Rows): Строки в виде словарей {колонка: значение} или поток их пачек.
+            batch_size (Optional[int]): Размер пачки для INSERT.
+            mode (str): Режим очистки, см. delete_all.
+
+        Возвращает:
+            SyncReport: Количество удаленных и вставленных строк.
+        """
+        deleted = await self.delete_all(mode=mode, commit=False)
+        inserted = 0
+        async for chunk in iter_chunks(rows):
+            chunk = [{**row, 'content_hash': compute_content_hash(row)} for row in chunk]
+            inserted += await self.bulk_create(chunk, batch_size=batch_size, commit=False)
+        await self.session.commit()
+        return SyncReport(inserted=inserted, deleted=deleted or 0)
+
+    async def sync(self, rows: Rows, batch_size: Optional[int] = None) -> SyncReport:
+        """
+        Синхронизирует таблицу с данными API в одной транзакции: новые и измененные строки
+        записываются через upsert, исчезнувшие удаляются, совпадающие по content_hash не трогаются.
+
+        Параметры:
+            rows (Rows): Строки ресурса или поток их пачек.
+            batch_size (Optional[int]): Размер пачки для upsert.
+
+        Возвращает:
+            SyncReport: Количество добавленных, обновленных, удаленных и неизмененных строк.
+        """
+        result = await self.session.execute(select(self.model.id, self.model.content_hash))
+        existing = dict(result.all())
+        report = SyncReport()
+        seen = set()
+
+        async for chunk in iter_chunks(rows):
+            changed: Dict[Any, List[Dict[str, Any]]] = {}
+            for row in chunk:
+                content_hash = compute_content_hash(row)
+                seen.add(row['id'])
+                if row['id'] not in existing:
+                    report.inserted += 1
+                elif existing[row['id']] != content_hash:
+                    report.updated += 1
+                else:
+                    report.unchanged += 1
+                    continue
+                parts = self.split_row(row)
+                parts[self.model] = {**parts[self.model], 'content_hash': content_hash}
+                for model, part in parts.items():
+                    changed.setdefault(model, []).append(part)
+
+            for model, model_rows in changed.items():
+                await self.upsert(model, model_rows, batch_size=batch_size)
+        report.deleted = await self.delete_by_ids(existing.keys() - seen)
         await self.session.commit()
+        return report
+
+    async def swap_all(self, rows: Rows, batch_size: Optional[int] = None) -> SyncReport:
+        """
+        Полная перезагрузка без окна с частично заполненной таблицей.
+
+        Данные загружаются в таблицу <имя>__staging, индексы строятся уже после загрузки,
+        затем в одной короткой транзакции живая таблица удаляется, а staging-таблица
+        и ее индексы переименовываются на ее место. Эксклюзивная блокировка держится
+        только на время переименования, ожидание блокировки ограничено SWAP_LOCK_TIMEOUT.
+
+        Параметры:
+            rows (Rows): Строки в виде словарей {колонка: значение} или поток их пачек.
+            batch_size (Optional[int]): Размер пачки для INSERT.
+
+        Возвращает:
+            SyncReport: Количество строк в старой и новой версии таблицы.
+        """
+        table = self.model.__table__
+        name = table.name
+        staging = f'{name}__staging'
+        primary_key = table.primary_key.name or f'{name}_pkey'
+        key_columns = ', '.join(f'"{column.name}"' for column in table.primary_key.columns)
+
+        await self.session.execute(text(f'DROP TABLE IF EXISTS "{staging}"'))
+        await self.session.execute(text(f'CREATE TABLE "{staging}" (LIKE "{name}")'))
+        staging_table = Table(staging, MetaData(), *(Column(column.name, column.type) for column in table.columns))
+        inserted = 0
+        async for chunk in iter_chunks(rows):
+            chunk = [{**row, 'content_hash': compute_content_hash(row)} for row in chunk]
+            inserted += await self.bulk_create(chunk, batch_size=batch_size, commit=False, table=staging_table)
+        await self.session.execute(
+            text(f'ALTER TABLE "{staging}" ADD CONSTRAINT "{staging}_pkey" PRIMARY KEY ({key_columns})')
+        )
+        for index in table.indexes:
+            columns = ', '.join(f'"{column.name}"' for column in index.columns)
+            unique = 'UNIQUE ' if index.unique else ''
+            await self.session.execute(text(f'CREATE {unique}INDEX "{index.name}__staging" ON "{staging}" ({columns})'))
+        await self.session.commit()
+
+        deleted = (await self.session.execute(select(func.count()).select_from(table))).scalar()
+        sequence = (await self.session.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': f'"{name}"'}
+        )).scalar()
+
+        await self.session.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+        await self.session.execute(text(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE'))
+        if sequence:
+            await self.session.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY NONE'))
+        await self.session.execute(text(f'DROP TABLE "{name}"'))
+        await self.session.execute(text(f'ALTER TABLE "{staging}" RENAME TO "{name}"'))
+        await self.session.execute(text(f'ALTER INDEX "{staging}_pkey" RENAME TO "{primary_key}"'))
+        for index in table.indexes:
+            await self.session.execute(text(f'ALTER INDEX "{index.name}__staging" RENAME TO "{index.name}"'))
+        if sequence:
+            await self.session.execute(
+                text(f"ALTER TABLE \"{name}\" ALTER COLUMN id SET DEFAULT nextval('{sequence}'::regclass)")
+            )
+            await self.session.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY "{name}".id'))
+        await self.session.commit()
+        return SyncReport(inserted=inserted, deleted=deleted)
+
+    async def save_all(self, rows: Rows, sync_mode: str = DEFAULT_SYNC_MODE) -> SyncReport:
+        """
+        Сохраняет данные ресурса выбранным способом.
+
+        Параметры:
+            rows (Rows): Строки ресурса или поток их пачек.
+            sync_mode (str): 'full' - полная перезагрузка таблицы, 'incremental' - синхронизация изменений,
+                'swap' - полная перезагрузка через staging-таблицу.
+
+        Возвращает:
+            SyncReport: Итог записи.
+
+        Исключения:
+            ValueError: Если передан неизвестный режим синхронизации.
+        """
+        if sync_mode == 'incremental':
+            return await self.sync(rows)
+        if sync_mode == 'full':
+            return await self.replace_all(rows)
+        if sync_mode == 'swap':
+            return await self.swap_all(rows)
+        raise ValueError(f'Unknown sync mode: {sync_mode}')
 
 
 class UserDAO(BaseDAO):
     """
     DAO для работы с пользователями.
 
+    Строки пользователей вложенные (адрес, геолокация, компания) и раскладываются
+    по таблицам user, company, address и geo методом split_row.
+
     Методы:
-        create_user(user, address, company, geo): Создает пользователя с привязанными адресом, компанией и геолокацией.
+        bulk_create(rows, batch_size, commit): Вставляет пользователей пачками по каждой таблице
+            в порядке внешних ключей.
     """
+    clear_models = (Geo, Address, Company, User)
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, User)
 
-    async def create_user(self, user: User, address: Address, company: Company, geo: Geo):
-        self.session.add_all([geo, address, company, user])
-        await self.session.commit()
-        await self.session.refresh(user)
-        return user
+    def split_row(self, row: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        address = dict(row['address'])
+        geo = address.pop('geo')
+        user = {key: value for key, value in row.items() if key not in ('address', 'company')}
+        return {
+            User: user,
+            Company: {'user_id': row['id'], **row['company']},
+            Address: {'user_id': row['id'], **address},
+            Geo: {'address_user_id': row['id'], **geo},
+        }
+
+    async def bulk_create(
+            self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None, commit: bool = True, table=None
+    ) -> int:
+        """
+        Вставляет сначала все строки user, затем company, address и geo:
+        по одному многострочному INSERT на пачку каждой таблицы вместо коммита на пользователя.
+
+        Параметры:
+            rows (List[Dict[str, Any]]): Вложенные строки пользователей.
+            batch_size (Optional[int]): Размер пачки.
+            commit (bool): Фиксировать ли транзакцию после вставки.
+            table: Не используется, таблицы определяются split_row.
+
+        Возвращает:
+            int: Количество вставленных пользователей.
+        """
+        tables: Dict[Any, List[Dict[str, Any]]] = {}
+        for row in rows:
+            for model, part in self.split_row(row).items():
+                tables.setdefault(model, []).append(part)
+        for model, model_rows in tables.items():
+            await super().bulk_create(model_rows, batch_size=batch_size, commit=False, table=model.__table__)
+        if commit:
+            await self.session.commit()
+        return len(rows)
+
+    async def swap_all(self, rows: Rows, batch_size: Optional[int] = None) -> SyncReport:
+        """
+        Таблицы пользователя связаны внешними ключами, поэтому подмена staging-таблиц
+        для них не выполняется: перезагрузка идет через replace_all в одной транзакции,
+        и читатели до ее фиксации видят прежние данные.
+        """
+        return await self.replace_all(rows, batch_size=batch_size)
 
 
 class PostDAO(BaseDAO):
@@ -90,3 +459,108 @@ class TodoDAO(BaseDAO):
     """
     def __init__(self, session: AsyncSession):
         super().__init__(session, Todo)
+
+
+class HttpCacheDAO(BaseDAO):
+    """
+    DAO для хранения валидаторов HTTP-кэша (ETag, Last-Modified) по URL ресурса.
+
+    Методы:
+        get_validators(url): Возвращает валидаторы прошлой загрузки ресурса.
+        save_validators(url, etag, last_modified): Сохраняет валидаторы успешной загрузки ресурса.
+    """
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, HttpCache)
+
+    async def get_validators(self, url: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        entry = await self.session.get(HttpCache, url)
+        if entry is None:
+            return None
+        return entry.etag, entry.last_modified
+
+    async def save_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        await self.upsert(HttpCache, [{'url': url, 'etag': etag, 'last_modified': last_modified}])
+        await self.session.commit()
+
+
+class SyncJobDAO(BaseDAO):
+    """
+    DAO для очереди фоновых задач синхронизации.
+
+    Выполняемая задача защищена advisory-блокировкой Postgres, которую держит соединение
+    обработчика от claim до finish. Если процесс обработчика остановился или соединение
+    оборвалось, Postgres снимает блокировку, и по ней прерванные задачи отличаются
+    от задач, которые выполняют другие живые процессы. Поэтому claim и finish одной задачи
+    должны выполняться в сессии, привязанной к одному соединению.
+
+    Методы:
+        enqueue(resource, chat_id): Ставит задачу в очередь.
+        claim(): Забирает из очереди самую раннюю задачу, отмечает ее выполняемой и берет ее блокировку.
+        finish(job_id, status, result): Сохраняет итог выполнения задачи и снимает ее блокировку.
+        requeue_running(): Возвращает в очередь выполняемые задачи, блокировку которых никто не держит.
+    """
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, SyncJob)
+
+    @staticmethod
+    def _lock_key(job_id: int) -> int:
+        return lock_key(f'sync_job:{job_id}')
+
+    async def enqueue(self, resource: str, chat_id: int) -> SyncJob:
+        job = SyncJob(resource=resource, chat_id=chat_id, status='queued')
+        self.session.add(job)
+        await self.session.commit()
+        return job
+
+    async def claim(self) -> Optional[SyncJob]:
+        # SKIP LOCKED позволяет нескольким обработчикам забирать задачи, не блокируя друг друга.
+        next_job = (
+            select(SyncJob.id)
+            .where(SyncJob.status == 'queued')
+            .order_by(SyncJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job = await self.session.scalar(
+            update(SyncJob)
+            .where(SyncJob.id == next_job)
+            .values(status='running', started_at=func.now())
+            .returning(SyncJob)
+        )
+        if job is not None:
+            # Блокировка берется до фиксации статуса running, чтобы requeue_running
+            # не застал задачу выполняемой, но без блокировки.
+            await self.session.execute(text('SELECT pg_advisory_lock(:key)'), {'key': self._lock_key(job.id)})
+        await self.session.commit()
+        return job
+
+    async def finish(self, job_id: int, status: str, result: str):
+        await self.session.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job_id)
+            .values(status=status, result=result, finished_at=func.now())
+        )
+        await self.session.commit()
+        await self.session.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self._lock_key(job_id)})
+        await self.session.commit()
+
+    async def requeue_running(self) -> int:
+        job_ids = (await self.session.scalars(select(SyncJob.id).where(SyncJob.status == 'running'))).all()
+        requeued = 0
+        for job_id in job_ids:
+            # Блокировка уровня транзакции снимается при commit; если ее держит обработчик,
+            # задача выполняется и не трогается.
+            free = await self.session.scalar(
+                text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': self._lock_key(job_id)}
+            )
+            if not free:
+                continue
+            result = await self.session.execute(
+                update(SyncJob)
+                .where(SyncJob.id == job_id, SyncJob.status == 'running')
+                .values(status='queued', started_at=None)
+            )
+            requeued += result.rowcount
+        await self.session.commit()
+        return requeued
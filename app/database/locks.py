@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.db import AsyncSessionLocal
+
+
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+class LockNotAcquired(Exception):
+    """
+    Исключение, возникающее, если блокировку держит другой процесс и она не была получена.
+    """
+    def __init__(self, name: str):
+        super().__init__(f'Блокировка {name} занята другим процессом')
+        self.name = name
+
+
+class HeldLock:
+    """
+    Удерживаемая advisory-блокировка.
+
+    Атрибуты:
+        name (str): Имя блокировки.
+        wait (float): Время ожидания блокировки в секундах.
+
+    Методы:
+        check(timeout): Проверяет, что соединение, которому принадлежит блокировка, живо.
+    """
+    def __init__(self, name: str, session: AsyncSession, wait: float):
+        self.name = name
+        self.wait = wait
+        self._session = session
+        self._lost = False
+
+    async def check(self, timeout: Optional[float] = None):
+        """
+        Выполняет SELECT 1 в соединении блокировки. Пока соединение живо, Postgres держит
+        блокировку за ним; если соединение оборвалось, блокировка уже снята.
+
+        Параметры:
+            timeout (Optional[float]): Наибольшее время ожидания ответа в секундах, None — без ограничения.
+
+        Исключения:
+            Exception: Если соединение оборвалось или не ответило за timeout: блокировка считается потерянной.
+        """
+        try:
+            await asyncio.wait_for(self._session.execute(text('SELECT 1')), timeout)
+        except BaseException:
+            self._lost = True
+            raise
+
+
+def lock_key(name: str) -> int:
+    """
+    Преобразует имя блокировки в 64-битный ключ для advisory-блокировок Postgres.
+    """
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+@asynccontextmanager
+async def advisory_lock(name: str, wait: bool = True, timeout: Optional[float] = None) -> AsyncIterator[HeldLock]:
+    """
+    Удерживает advisory-блокировку Postgres на время блока with.
+
+    Блокировка общая для всех процессов, работающих с базой данных (например, воркеров gunicorn),
+    и принадлежит соединению: сессия не фиксирует транзакцию до снятия блокировки, чтобы
+    соединение не вернулось в пул, а при обрыве соединения Postgres снимает блокировку сам.
+
+    Параметры:
+        name (str): Имя блокировки, например 'sync:photos'.
+        wait (bool): Ждать освобождения блокировки (True) или сразу сообщить, что она занята (False).
+        timeout (Optional[float]): Наибольшее время ожидания в секундах, None — без ограничения.
+
+    Возвращает:
+        HeldLock: Удерживаемая блокировка со временем ее ожидания.
+
+    Исключения:
+        LockNotAcquired: Если блокировка занята, а ждать не нужно или время ожидания истекло.
+    """
+    key = lock_key(name)
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        if wait:
+            if timeout:
+                await session.execute(
+                    text("SELECT set_config('lock_timeout', :timeout, true)"), {'timeout': f'{int(timeout * 1000)}ms'}
+                )
+            try:
+                await session.execute(text('SELECT pg_advisory_lock(:key)'), {'key': key})
+            except DBAPIError as error:
+                if getattr(error.orig, 'pgcode', None) == LOCK_NOT_AVAILABLE:
+                    raise LockNotAcquired(name) from error
+                raise
+        elif not await session.scalar(text('SELECT pg_try_advisory_lock(:key)'), {'key': key}):
+            raise LockNotAcquired(name)
+
+        lock = HeldLock(name, session, time.perf_counter() - started)
+        try:
+            yield lock
+        finally:
+            if lock._lost:
+                # Соединение не отвечает: оно закрывается, а не возвращается в пул, и Postgres снимает блокировку сам.
+                await session.invalidate()
+            else:
+                await session.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': key})
+                await session.rollback()
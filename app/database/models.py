@@ -1,4 +1,7 @@
-from sqlalchemy import Integer, String,ForeignKey, Boolean
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text, ForeignKey, Boolean, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,6 +15,7 @@ class Post(Base):
     user_id: Mapped[int] = mapped_column(Integer)
     title: Mapped[str] = mapped_column(String)
     body: Mapped[str] = mapped_column(String)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class Comment(Base):
@@ -22,6 +26,7 @@ class Comment(Base):
     name: Mapped[str] = mapped_column(String)
     email: Mapped[str] = mapped_column(String)
     body: Mapped[str] = mapped_column(String)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class Photo(Base):
@@ -32,6 +37,7 @@ class Photo(Base):
     title: Mapped[str] = mapped_column(String)
     url: Mapped[str] = mapped_column(String)
     thumbnail_url: Mapped[str] = mapped_column(String)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class Album(Base):
@@ -40,6 +46,7 @@ class Album(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer)
     title: Mapped[str] = mapped_column(String)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class Todo(Base):
@@ -49,6 +56,7 @@ class Todo(Base):
     user_id: Mapped[int] = mapped_column(Integer)
     title: Mapped[str] = mapped_column(String)
     completed: Mapped[bool] = mapped_column(Boolean)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
 class Geo(Base):
@@ -96,6 +104,7 @@ class User(Base):
     email: Mapped[str] = mapped_column(String)
     phone: Mapped[str] = mapped_column(String)
     website: Mapped[str] = mapped_column(String)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     address: Mapped['Address'] = relationship(
         back_populates='user', uselist=False, cascade='all, delete'
@@ -103,3 +112,24 @@ class User(Base):
     company: Mapped['Company'] = relationship(
         back_populates='user', uselist=False, cascade='all, delete'
     )
+
+
+class HttpCache(Base):
+    __tablename__ = 'http_cache'
+
+    url: Mapped[str] = mapped_column(String, primary_key=True)
+    etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+
+class SyncJob(Base):
+    __tablename__ = 'sync_jobs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    resource: Mapped[str] = mapped_column(String)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    status: Mapped[str] = mapped_column(String, index=True, default='queued')
+    result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
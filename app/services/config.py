@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from typing import Dict
 from dotenv import load_dotenv
 
 
@@ -14,6 +15,53 @@ class Config:
     spreadsheet_id: str
     credentials_file: str
     url: str
+    db_batch_size: int
+    db_clear_mode: str
+    sync_mode: str
+    http_limit: int
+    http_limit_per_host: int
+    http_keepalive_timeout: float
+    http_timeout: float
+    http_connect_timeout: float
+    stream_chunk_size: int
+    sync_concurrency: int
+    api_page_sizes: Dict[str, int]
+    api_page_concurrency: Dict[str, int]
+    api_default_page_concurrency: int
+    validation_strict: bool
+    sheets_metadata_ttl: float
+    sheets_write_mode: str
+    sheets_chunk_cells: int
+    sheets_write_concurrency: int
+    sheets_write_retries: int
+    sheets_sync_mode: str
+    sheets_backend: str
+    sheets_read_quota: float
+    sheets_write_quota: float
+    sheets_quota_burst: float
+    sheets_quota_processes: int
+    sheets_coalesce_window: float
+    pipeline_queue_size: int
+    job_workers: int
+    job_poll_interval: float
+    sync_debounce: float
+    sync_lock_mode: str
+    sync_lock_timeout: float
+    sync_intervals: Dict[str, int]
+    sync_default_interval: int
+    sync_stagger: float
+    sync_jitter: float
+
+
+def parse_int_mapping(value: str) -> Dict[str, int]:
+    """
+    Разбирает настройку вида 'photos=500,comments=100' в словарь {'photos': 500, 'comments': 100}.
+    """
+    mapping = {}
+    for pair in filter(None, (part.strip() for part in value.split(','))):
+        key, number = pair.split('=', 1)
+        mapping[key.strip()] = int(number)
+    return mapping
 
 
 def load_config() -> Config:
@@ -27,5 +75,41 @@ def load_config() -> Config:
         webhook_url=os.getenv('WEBHOOK_URL'),
         spreadsheet_id=os.getenv('SPREADSHEET_ID'),
         credentials_file=os.getenv('CREDENTIALS_FILE'),
-        url='https://jsonplaceholder.typicode.com/'
+        url='https://jsonplaceholder.typicode.com/',
+        db_batch_size=int(os.getenv('DB_BATCH_SIZE', 1000)),
+        db_clear_mode=os.getenv('DB_CLEAR_MODE', 'delete'),
+        sync_mode=os.getenv('SYNC_MODE', 'full'),
+        http_limit=int(os.getenv('HTTP_LIMIT', 100)),
+        http_limit_per_host=int(os.getenv('HTTP_LIMIT_PER_HOST', 10)),
+        http_keepalive_timeout=float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30)),
+        http_timeout=float(os.getenv('HTTP_TIMEOUT', 60)),
+        http_connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 10)),
+        stream_chunk_size=int(os.getenv('STREAM_CHUNK_SIZE', 1000)),
+        sync_concurrency=int(os.getenv('SYNC_CONCURRENCY', 3)),
+        api_page_sizes=parse_int_mapping(os.getenv('API_PAGE_SIZES', '')),
+        api_page_concurrency=parse_int_mapping(os.getenv('API_PAGE_CONCURRENCY', '')),
+        api_default_page_concurrency=int(os.getenv('API_DEFAULT_PAGE_CONCURRENCY', 4)),
+        validation_strict=os.getenv('VALIDATION_STRICT', 'false').lower() in ('1', 'true', 'yes'),
+        sheets_metadata_ttl=float(os.getenv('SHEETS_METADATA_TTL', 300)),
+        sheets_write_mode=os.getenv('SHEETS_WRITE_MODE', 'values'),
+        sheets_chunk_cells=int(os.getenv('SHEETS_CHUNK_CELLS', 10000)),
+        sheets_write_concurrency=int(os.getenv('SHEETS_WRITE_CONCURRENCY', 4)),
+        sheets_write_retries=int(os.getenv('SHEETS_WRITE_RETRIES', 3)),
+        sheets_sync_mode=os.getenv('SHEETS_SYNC_MODE', 'full'),
+        sheets_backend=os.getenv('SHEETS_BACKEND', 'googleapiclient'),
+        sheets_read_quota=float(os.getenv('SHEETS_READ_QUOTA', 60)),
+        sheets_write_quota=float(os.getenv('SHEETS_WRITE_QUOTA', 60)),
+        sheets_quota_burst=float(os.getenv('SHEETS_QUOTA_BURST', 10)),
+        sheets_quota_processes=int(os.getenv('SHEETS_QUOTA_PROCESSES', 1)),
+        sheets_coalesce_window=float(os.getenv('SHEETS_COALESCE_WINDOW', 0.05)),
+        pipeline_queue_size=int(os.getenv('PIPELINE_QUEUE_SIZE', 4)),
+        job_workers=int(os.getenv('JOB_WORKERS', 2)),
+        job_poll_interval=float(os.getenv('JOB_POLL_INTERVAL', 5)),
+        sync_debounce=float(os.getenv('SYNC_DEBOUNCE', 10)),
+        sync_lock_mode=os.getenv('SYNC_LOCK_MODE', 'wait'),
+        sync_lock_timeout=float(os.getenv('SYNC_LOCK_TIMEOUT', 300)),
+        sync_intervals=parse_int_mapping(os.getenv('SYNC_INTERVALS', '')),
+        sync_default_interval=int(os.getenv('SYNC_DEFAULT_INTERVAL', 0)),
+        sync_stagger=float(os.getenv('SYNC_STAGGER', 30)),
+        sync_jitter=float(os.getenv('SYNC_JITTER', 0.1))
     )
@@ -1,9 +1,22 @@
 import asyncio
-from typing import List, Any
+import hashlib
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import List, Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+import aiohttp
+import google_auth_httplib2
+import httplib2
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 from app.services.config import load_config
+from app.services.rate_limiter import PRIORITY_HIGH, RequestScheduler
+from app.services.sheets_http_client import AioSheetsClient
 
 
 config = load_config()
@@ -11,83 +24,997 @@ config = load_config()
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 SPREADSHEET_ID = config.spreadsheet_id
 CREDENTIALS_FILE = config.credentials_file
+METADATA_TTL = config.sheets_metadata_ttl
+WRITE_MODE = config.sheets_write_mode
+CHUNK_CELLS = config.sheets_chunk_cells
+WRITE_CONCURRENCY = config.sheets_write_concurrency
+WRITE_RETRIES = config.sheets_write_retries
+SHEETS_SYNC_MODE = config.sheets_sync_mode
+SHEETS_BACKEND = config.sheets_backend
+READ_QUOTA = config.sheets_read_quota
+WRITE_QUOTA = config.sheets_write_quota
+QUOTA_BURST = config.sheets_quota_burst
+QUOTA_PROCESSES = max(1, config.sheets_quota_processes)
+COALESCE_WINDOW = config.sheets_coalesce_window
+
+
+def is_range_not_found(error: Exception) -> bool:
+    """
+    Проверяет, что ошибка API вызвана обращением к несуществующему листу.
+    """
+    return isinstance(error, HttpError) and error.resp.status == 400 and (
+        'Unable to parse range' in str(error) or 'No grid with id' in str(error)
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Проверяет, что запрос к API можно повторить: превышение квоты, ошибка сервера или сбой сети.
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+    # aiohttp.ClientError покрывает обрывы соединения бэкенда aiohttp (ServerDisconnectedError,
+    # ClientPayloadError), которые не являются OSError.
+    return isinstance(error, (OSError, asyncio.TimeoutError, httplib2.HttpLib2Error, aiohttp.ClientError))
+
+
+def normalize_row(row: Iterable[Any]) -> List[Any]:
+    """
+    Приводит строку листа к виду, в котором значения из API и прочитанные из таблицы сравнимы:
+    None становится пустой строкой, целые float — int, пустые ячейки в конце отбрасываются.
+    """
+    values = []
+    for value in row:
+        if value is None:
+            value = ''
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        values.append(value)
+    while values and values[-1] == '':
+        values.pop()
+    return values
+
+
+def row_hash(row: Iterable[Any]) -> str:
+    """
+    Вычисляет хэш строки листа для сравнения с ранее записанной.
+    """
+    payload = json.dumps(normalize_row(row), ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def sheet_id_for(title: str) -> int:
+    """
+    Детерминированно выбирает идентификатор для нового листа по его названию, чтобы
+    создание листа и запись в него можно было отправить одним batchUpdate.
+    """
+    return zlib.crc32(title.encode('utf-8')) & 0x7FFFFFFF
+
+
+def cell_data(value: Any) -> Dict:
+    """
+    Преобразует значение Python в CellData для запросов updateCells.
+    """
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def row_data(data: List[List[Any]]) -> List[Dict]:
+    """
+    Преобразует двумерный список значений в список RowData.
+    """
+    return [{'values': [cell_data(value) for value in row]} for row in data]
+
+
+class SheetsClient:
+    """
+    Долгоживущий клиент Google Sheets API.
+
+    Учетные данные сервисного аккаунта читаются с диска один раз и обновляются только
+    по истечении токена, объект сервиса строится один раз из встроенного discovery-документа.
+    httplib2 не потокобезопасен, поэтому у каждого потока пула свой HTTP-транспорт,
+    а общий объект сервиса используется только для построения запросов.
+
+    Атрибуты:
+        spreadsheet_id (str): Идентификатор таблицы.
+
+    Методы:
+        get(fields): Возвращает метаданные таблицы.
+        batch_update(requests): Выполняет spreadsheets.batchUpdate.
+        values_clear(range_name): Очищает диапазон.
+        values_update(range_name, values): Записывает значения в диапазон.
+        values_get(range_name): Читает значения диапазона без форматирования.
+        values_batch_update(data): Записывает значения в несколько диапазонов одним запросом.
+    """
+    def __init__(self, credentials_file: str, spreadsheet_id: str, scopes: Optional[List[str]] = None):
+        self.credentials_file = credentials_file
+        self.spreadsheet_id = spreadsheet_id
+        self.scopes = scopes or SCOPES
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._credentials = None
+        self._service = None
+
+    def fresh_credentials(self) -> service_account.Credentials:
+        """
+        Возвращает учетные данные, загружая их при первом обращении и обновляя токен, если он истек.
+        """
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self.credentials_file, scopes=self.scopes)
+            if not self._credentials.valid:
+                self._credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
+            return self._credentials
+
+    @property
+    def service(self):
+        with self._lock:
+            if self._service is None:
+                self._service = build(
+                    'sheets', 'v4', http=httplib2.Http(), cache_discovery=False, static_discovery=True
+                )
+            return self._service
+
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.fresh_credentials(), http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def _execute(self, build_request: Callable[[Any], Any]) -> Dict:
+        self.fresh_credentials()
+        return build_request(self.service.spreadsheets()).execute(http=self._http())
+
+    async def _call(self, build_request: Callable[[Any], Any]) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._execute, build_request)
+
+    async def get(self, fields: Optional[str] = None) -> Dict:
+        return await self._call(lambda sheets: sheets.get(spreadsheetId=self.spreadsheet_id, fields=fields))
+
+    async def batch_update(self, requests: List[Dict]) -> Dict:
+        return await self._call(lambda sheets: sheets.batchUpdate(
+            spreadsheetId=self.spreadsheet_id, body={'requests': requests}))
+
+    async def values_clear(self, range_name: str) -> Dict:
+        return await self._call(lambda sheets: sheets.values().clear(
+            spreadsheetId=self.spreadsheet_id, range=range_name))
+
+    async def values_update(self, range_name: str, values: List[List[Any]]) -> Dict:
+        return await self._call(lambda sheets: sheets.values().update(
+            spreadsheetId=self.spreadsheet_id, range=range_name, valueInputOption='RAW', body={'values': values}))
+
+    async def values_get(self, range_name: str) -> Dict:
+        return await self._call(lambda sheets: sheets.values().get(
+            spreadsheetId=self.spreadsheet_id, range=range_name, valueRenderOption='UNFORMATTED_VALUE'))
+
+    async def values_batch_update(self, data: List[Dict]) -> Dict:
+        return await self._call(lambda sheets: sheets.values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id, body={'valueInputOption': 'RAW', 'data': data}))
+
+
+@dataclass
+class SheetProperties:
+    """
+    Свойства листа таблицы.
+
+    Атрибуты:
+        sheet_id (int): Идентификатор листа.
+        title (str): Название листа.
+        row_count (int): Количество строк сетки листа.
+        column_count (int): Количество столбцов сетки листа.
+    """
+    sheet_id: int
+    title: str
+    row_count: int
+    column_count: int
+
+    @property
+    def sheet_range(self) -> str:
+        """
+        Диапазон всего листа, например "'Posts'".
+
+        Размер сетки в кэше метаданных может отставать от настоящего: лист могли расширить
+        другие процессы. Поэтому очистка и чтение листа не ограничиваются закэшированной сеткой,
+        а размер из кэша используется только для решения, нужно ли расширять сетку.
+        """
+        return f"'{self.title}'"
+
+
+class SpreadsheetMetadataCache:
+    """
+    Кэш метаданных таблицы: названия, идентификаторы и размеры сетки листов.
+
+    Позволяет в установившемся режиме не выполнять sheets.get перед каждой записью.
+    Кэш обновляется лениво: при первом обращении, по истечении ttl и после сброса
+    (invalidate), который выполняется при ошибке обращения к несуществующему листу.
+
+    Методы:
+        get_sheet(title): Возвращает свойства листа или None, если листа нет.
+        refresh(): Загружает метаданные, если кэш пуст или устарел.
+        store(properties): Сохраняет свойства листа из ответа API (например, addSheet).
+        grow(title, rows, columns): Учитывает расширение сетки листа после записи.
+        invalidate(): Сбрасывает кэш.
+    """
+    def __init__(self, client: SheetsClient, ttl: float = METADATA_TTL):
+        self.client = client
+        self.ttl = ttl
+        self._sheets: Optional[Dict[str, SheetProperties]] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_sheet(self, title: str) -> Optional[SheetProperties]:
+        if self._stale():
+            await self.refresh()
+        return self._sheets.get(title)
+
+    async def refresh(self):
+        async with self._lock:
+            # Пока ждали блокировку, кэш мог обновить другой вызов: повторный sheets.get не нужен.
+            if not self._stale():
+                return
+            metadata = await self.client.get(
+                fields='sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))'
+            )
+            sheets = {}
+            for sheet in metadata.get('sheets', []):
+                properties = self._parse(sheet['properties'])
+                sheets[properties.title] = properties
+            self._sheets = sheets
+            self._loaded_at = time.monotonic()
+
+    def store(self, properties: Dict) -> SheetProperties:
+        parsed = self._parse(properties)
+        if self._sheets is not None:
+            self._sheets[parsed.title] = parsed
+        return parsed
+
+    def grow(self, title: str, rows: int, columns: int):
+        sheet = (self._sheets or {}).get(title)
+        if sheet is not None:
+            sheet.row_count = max(sheet.row_count, rows)
+            sheet.column_count = max(sheet.column_count, columns)
+
+    def invalidate(self):
+        self._sheets = None
+
+    def _stale(self) -> bool:
+        return self._sheets is None or time.monotonic() - self._loaded_at > self.ttl
+
+    @staticmethod
+    def _parse(properties: Dict) -> SheetProperties:
+        grid = properties.get('gridProperties', {})
+        return SheetProperties(
+            sheet_id=properties['sheetId'],
+            title=properties['title'],
+            row_count=grid.get('rowCount', 1000),
+            column_count=grid.get('columnCount', 26),
+        )
+
+
+class WriteCoalescer:
+    """
+    Объединяет записи в таблицу, поступившие за короткое окно, в один запрос.
+
+    Записи значений (диапазоны ValueRange) со всех листов собираются в один values.batchUpdate,
+    запросы spreadsheets.batchUpdate — в один spreadsheets.batchUpdate; каждый вызывающий получает
+    свою часть ответа. Набор отправляется по истечении окна или раньше, если накопилось
+    max_cells ячеек; запись, с которой набор превысил бы max_cells, уходит уже в следующий
+    набор, так что объединение не укрупняет блоки ChunkedSheetWriter сверх SHEETS_CHUNK_CELLS.
+    Если объединенный запрос завершился ошибкой, его части отправляются по отдельности,
+    чтобы ошибка досталась только тому, чья запись ее вызвала.
+
+    Атрибуты:
+        window (float): Окно ожидания записей в секундах.
+        max_cells (int): Наибольшее количество ячеек в одном наборе.
+
+    Методы:
+        values(data): Ставит диапазоны в набор для values.batchUpdate и возвращает ответы по ним.
+        requests(requests): Ставит запросы в набор для spreadsheets.batchUpdate и возвращает ответы по ним.
+    """
+    def __init__(self, send_values: Callable[[List[Dict]], Any], send_requests: Callable[[List[Dict]], Any],
+                 window: float = COALESCE_WINDOW, max_cells: int = CHUNK_CELLS):
+        self.send_values = send_values
+        self.send_requests = send_requests
+        self.window = window
+        self.max_cells = max_cells
+        self._values: List[Tuple[List[Dict], asyncio.Future]] = []
+        self._requests: List[Tuple[List[Dict], asyncio.Future]] = []
+        self._cells = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def values(self, data: List[Dict]) -> List[Dict]:
+        cells = sum(len(row) for item in data for row in item['values'])
+        self._make_room(cells)
+        future = asyncio.get_running_loop().create_future()
+        self._values.append((data, future))
+        self._cells += cells
+        self._schedule()
+        return await future
+
+    async def requests(self, requests: List[Dict]) -> List[Dict]:
+        cells = sum(
+            len(row.get('values', [])) for request in requests for row in request.get('updateCells', {}).get('rows', [])
+        )
+        self._make_room(cells)
+        future = asyncio.get_running_loop().create_future()
+        self._requests.append((requests, future))
+        self._cells += cells
+        self._schedule()
+        return await future
+
+    def _make_room(self, cells: int):
+        if self._cells and self._cells + cells > self.max_cells:
+            self._start_flush()
+
+    def _schedule(self):
+        loop = asyncio.get_running_loop()
+        if self._cells >= self.max_cells:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        values, self._values = self._values, []
+        requests, self._requests = self._requests, []
+        self._cells = 0
+        task = asyncio.get_running_loop().create_task(self._flush(values, requests))
+        self._flushes.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task):
+        self._flushes.discard(task)
+        # Ошибки отправки уже переданы вызывающим через их future; здесь исключение только забирается,
+        # чтобы asyncio не сообщал о неполученном исключении задачи.
+        if not task.cancelled():
+            task.exception()
+
+    async def _flush(self, values: List[Tuple[List[Dict], asyncio.Future]],
+                     requests: List[Tuple[List[Dict], asyncio.Future]]):
+        await asyncio.gather(
+            self._send(values, self.send_values, 'responses'),
+            self._send(requests, self.send_requests, 'replies'),
+        )
+
+    @staticmethod
+    async def _send(batch: List[Tuple[List[Dict], asyncio.Future]], send: Callable, key: str):
+        # Вызывающий мог быть отменен, пока ждал набор: его future уже завершен, и результат ему не нужен.
+        batch = [(parts, future) for parts, future in batch if not future.done()]
+        if not batch:
+            return
+        try:
+            reply = await send([part for parts, _ in batch for part in parts])
+        except Exception as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+                return
+            for parts, future in batch:
+                if future.done():
+                    continue
+                try:
+                    result = (await send(parts)).get(key, [])
+                except Exception as part_error:
+                    if not future.done():
+                        future.set_exception(part_error)
+                    continue
+                if not future.done():
+                    future.set_result(result)
+            return
+
+        results = reply.get(key, [])
+        offset = 0
+        for parts, future in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(parts)])
+            offset += len(parts)
+
+
+class RateLimitedSheetsClient:
+    """
+    Клиент Google Sheets, пропускающий каждый запрос через планировщики с квотами.
+
+    Чтения (get, values_get) и записи идут через отдельные планировщики, так как у Google Sheets API
+    отдельные поминутные квоты на чтение и запись. Запросы, меняющие структуру таблицы или очищающие
+    лист, получают высокий приоритет: от них зависят ожидающие в очереди записи данных.
+    Ошибки квоты (429) и сервера повторяются планировщиком с экспоненциальной задержкой.
+    Если задано окно объединения, записи значений и запросы batchUpdate со всех листов
+    объединяются WriteCoalescer и тратят один запрос квоты на набор.
+
+    Атрибуты:
+        client: Клиент, выполняющий запросы (SheetsClient или AioSheetsClient).
+        reads (RequestScheduler): Планировщик запросов на чтение.
+        writes (RequestScheduler): Планировщик запросов на запись.
+        coalescer (Optional[WriteCoalescer]): Объединитель записей, None — без объединения.
+    """
+    def __init__(self, client: Union[SheetsClient, AioSheetsClient],
+                 reads: RequestScheduler, writes: RequestScheduler, coalesce_window: float = COALESCE_WINDOW):
+        self.client = client
+        self.reads = reads
+        self.writes = writes
+        self.coalescer = None
+        if coalesce_window > 0:
+            self.coalescer = WriteCoalescer(self._send_values, self._send_requests, coalesce_window)
+
+    async def _send_values(self, data: List[Dict]) -> Dict:
+        return await self.writes.submit(lambda: self.client.values_batch_update(data), is_retryable)
+
+    async def _send_requests(self, requests: List[Dict]) -> Dict:
+        return await self.writes.submit(lambda: self.client.batch_update(requests), is_retryable)
+
+    async def get(self, fields: Optional[str] = None) -> Dict:
+        return await self.reads.submit(lambda: self.client.get(fields), is_retryable, PRIORITY_HIGH)
+
+    async def values_get(self, range_name: str) -> Dict:
+        return await self.reads.submit(lambda: self.client.values_get(range_name), is_retryable)
+
+    async def batch_update(self, requests: List[Dict]) -> Dict:
+        if self.coalescer is None:
+            return await self._send_requests(requests)
+        return {'replies': await self.coalescer.requests(requests)}
+
+    async def values_clear(self, range_name: str) -> Dict:
+        return await self.writes.submit(lambda: self.client.values_clear(range_name), is_retryable, PRIORITY_HIGH)
+
+    async def values_update(self, range_name: str, values: List[List[Any]]) -> Dict:
+        if self.coalescer is None:
+            return await self.writes.submit(lambda: self.client.values_update(range_name, values), is_retryable)
+        responses = await self.coalescer.values([{'range': range_name, 'values': values}])
+        return responses[0] if responses else {}
+
+    async def values_batch_update(self, data: List[Dict]) -> Dict:
+        if self.coalescer is None:
+            return await self._send_values(data)
+        return {'responses': await self.coalescer.values(data)}
+
+
+_client: Optional[RateLimitedSheetsClient] = None
+_metadata: Optional[SpreadsheetMetadataCache] = None
+
+
+def get_sheets_client() -> RateLimitedSheetsClient:
+    """
+    Возвращает общий для приложения клиент Google Sheets, создавая его при первом обращении.
+    Реализация выбирается настройкой SHEETS_BACKEND: 'googleapiclient' — вызовы библиотеки
+    Google в пуле потоков, 'aiohttp' — прямые асинхронные запросы к REST API. Запросы
+    выполняются в темпе квот SHEETS_READ_QUOTA и SHEETS_WRITE_QUOTA.
+
+    Планировщики квот у каждого процесса свои, поэтому квоты и запас запросов делятся
+    на SHEETS_QUOTA_PROCESSES — число процессов (воркеров gunicorn), работающих с таблицей,
+    чтобы вместе они не превышали квоту Google Sheets API.
+
+    Возвращает:
+        RateLimitedSheetsClient: Клиент Google Sheets.
+    """
+    global _client
+    if _client is None:
+        if SHEETS_BACKEND == 'aiohttp':
+            client = AioSheetsClient(CREDENTIALS_FILE, SPREADSHEET_ID, SCOPES)
+        else:
+            client = SheetsClient(CREDENTIALS_FILE, SPREADSHEET_ID)
+        burst = max(1.0, QUOTA_BURST / QUOTA_PROCESSES)
+        _client = RateLimitedSheetsClient(
+            client,
+            reads=RequestScheduler(READ_QUOTA / QUOTA_PROCESSES, burst, WRITE_RETRIES),
+            writes=RequestScheduler(WRITE_QUOTA / QUOTA_PROCESSES, burst, WRITE_RETRIES),
+        )
+    return _client
+
+
+def sheets_scheduler_stats() -> Dict[str, str]:
+    """
+    Возвращает метрики очередей запросов к Google Sheets API.
+
+    Возвращает:
+        Dict[str, str]: Описание метрик очередей чтения и записи.
+    """
+    client = get_sheets_client()
+    return {'чтение': str(client.reads.stats), 'запись': str(client.writes.stats)}
+
+
+def get_metadata_cache() -> SpreadsheetMetadataCache:
+    """
+    Возвращает общий кэш метаданных таблицы.
+
+    Возвращает:
+        SpreadsheetMetadataCache: Кэш метаданных.
+    """
+    global _metadata
+    if _metadata is None:
+        _metadata = SpreadsheetMetadataCache(get_sheets_client())
+    return _metadata
 
 
 async def write_to_google_sheets(data: List[List[Any]], sheet_name: str):
     """
-    Асинхронно записывает данные в Google Sheets.
+    Асинхронно записывает данные в Google Sheets, заменяя содержимое листа.
 
     Параметры:
         data (List[List[Any]]): Двумерный список с данными для записи.
         sheet_name (str): Название листа, в который будут записаны данные.
 
-    Возвращает:
-        bool: True, если данные успешно записаны, иначе False.
-
     Исключения:
-        Exception: Если произошла ошибка при записи данных.
+        Exception: Если данные не удалось записать, в том числе после повторов при превышении квоты.
     """
-    try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, lambda: _write_to_sheets_sync(data, sheet_name))
-        return True
-    except Exception as e:
-        return False
+    replace = _replace_sheet_batch if WRITE_MODE == 'batch' else _replace_sheet
+    await replace(get_sheets_client(), get_metadata_cache(), data, sheet_name)
 
 
-def _write_to_sheets_sync(data: List[List[Any]], sheet_name: str):
+async def _replace_sheet(
+        client: SheetsClient, metadata: SpreadsheetMetadataCache, data: List[List[Any]], sheet_name: str
+):
     """
-    Синхронно записывает данные в Google Sheets.
+    Заменяет содержимое листа Google Sheets.
 
     Параметры:
+        client (SheetsClient): Клиент Google Sheets.
+        metadata (SpreadsheetMetadataCache): Кэш метаданных таблицы.
         data (List[List[Any]]): Двумерный список с данными для записи.
         sheet_name (str): Название листа, в который будут записаны данные.
 
     Действия:
-        - Авторизуется в Google Sheets API.
-        - Проверяет существование листа, создает его при необходимости.
-        - Очищает содержимое листа.
+        - Берет свойства листа из кэша метаданных, создает лист при необходимости.
+        - Очищает все содержимое листа.
         - Записывает новые данные в лист.
+        - Если лист был удален вне бота, сбрасывает кэш и повторяет запись один раз.
 
     Исключения:
         Exception: Если произошла ошибка при взаимодействии с Google Sheets API.
     """
-    creds = service_account.Credentials.from_service_account_file(
-        CREDENTIALS_FILE, scopes=SCOPES)
+    for attempt in range(2):
+        sheet = await metadata.get_sheet(sheet_name)
+        if sheet is None:
+            reply = await client.batch_update([{
+                'addSheet': {
+                    'properties': {
+                        'title': sheet_name
+                    }
+                }
+            }])
+            sheet = metadata.store(reply['replies'][0]['addSheet']['properties'])
+
+        try:
+            await client.values_clear(sheet.sheet_range)
+            await client.values_update(f"'{sheet_name}'!A1", data)
+        except HttpError as error:
+            if attempt or not is_range_not_found(error):
+                raise
+            metadata.invalidate()
+            continue
 
-    service = build('sheets', 'v4', credentials=creds)
-    sheets = service.spreadsheets()
+        metadata.grow(sheet_name, len(data), max((len(row) for row in data), default=0))
+        return
 
-    sheet_metadata = sheets.get(spreadsheetId=SPREADSHEET_ID).execute()
-    sheets_list = sheet_metadata.get('sheets', '')
-    sheet_exists = False
 
-    for sheet in sheets_list:
-        if sheet['properties']['title'] == sheet_name:
-            sheet_exists = True
-            break
+async def _replace_sheet_batch(
+        client: SheetsClient, metadata: SpreadsheetMetadataCache, data: List[List[Any]], sheet_name: str
+):
+    """
+    Заменяет содержимое листа Google Sheets одним запросом spreadsheets.batchUpdate.
 
-    if not sheet_exists:
-        request_body = {
-            'requests': [{
+    Параметры:
+        client (SheetsClient): Клиент Google Sheets.
+        metadata (SpreadsheetMetadataCache): Кэш метаданных таблицы.
+        data (List[List[Any]]): Двумерный список с данными для записи.
+        sheet_name (str): Название листа, в который будут записаны данные.
+
+    Действия:
+        - Если листа нет, добавляет в запрос addSheet с заранее выбранным sheetId и сеткой под размер данных.
+        - Если сетка существующего листа меньше данных, добавляет в запрос updateSheetProperties.
+        - Записывает данные через updateCells по всему листу: ячейки вне данных очищаются
+          той же маской полей userEnteredValue, отдельный values.clear не нужен.
+        - Если лист был удален вне бота, сбрасывает кэш и повторяет запись один раз.
+
+    Исключения:
+        Exception: Если произошла ошибка при взаимодействии с Google Sheets API.
+    """
+    rows = max(len(data), 1)
+    columns = max((len(row) for row in data), default=1) or 1
+
+    for attempt in range(2):
+        sheet = await metadata.get_sheet(sheet_name)
+        requests = []
+        if sheet is None:
+            sheet = SheetProperties(sheet_id_for(sheet_name), sheet_name, rows, columns)
+            requests.append({
                 'addSheet': {
                     'properties': {
-                        'title': sheet_name
+                        'sheetId': sheet.sheet_id,
+                        'title': sheet_name,
+                        'gridProperties': {'rowCount': rows, 'columnCount': columns}
                     }
                 }
-            }]
-        }
-        sheets.batchUpdate(spreadsheetId=SPREADSHEET_ID, body=request_body).execute()
-
-    range_name = f'{sheet_name}!A1:ZZ'
-    sheets.values().clear(spreadsheetId=SPREADSHEET_ID, range=range_name).execute()
-
-    body = {
-        'values': data
-    }
-    sheets.values().update(
-        spreadsheetId=SPREADSHEET_ID,
-        range=f'{sheet_name}!A1',
-        valueInputOption='RAW',
-        body=body
-    ).execute()
+            })
+        elif sheet.row_count < rows or sheet.column_count < columns:
+            requests.append({
+                'updateSheetProperties': {
+                    'properties': {
+                        'sheetId': sheet.sheet_id,
+                        'gridProperties': {
+                            'rowCount': max(sheet.row_count, rows),
+                            'columnCount': max(sheet.column_count, columns)
+                        }
+                    },
+                    'fields': 'gridProperties(rowCount,columnCount)'
+                }
+            })
+        requests.append({
+            'updateCells': {
+                'range': {'sheetId': sheet.sheet_id},
+                'rows': row_data(data),
+                'fields': 'userEnteredValue'
+            }
+        })
+
+        try:
+            await client.batch_update(requests)
+        except HttpError as error:
+            if attempt or not is_range_not_found(error):
+                raise
+            metadata.invalidate()
+            continue
+
+        metadata.store({
+            'sheetId': sheet.sheet_id,
+            'title': sheet_name,
+            'gridProperties': {
+                'rowCount': max(sheet.row_count, rows),
+                'columnCount': max(sheet.column_count, columns)
+            }
+        })
+        return
+
+
+@dataclass
+class WriteStats:
+    """
+    Итог записи данных в лист Google Sheets.
+
+    Атрибуты:
+        cells (int): Количество записанных ячеек.
+        chunks (int): Количество отправленных блоков.
+        failed_cells (int): Количество ячеек в блоках, которые не удалось записать.
+        elapsed (float): Время записи в секундах.
+    """
+    cells: int = 0
+    chunks: int = 0
+    failed_cells: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.cells / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        summary = f'{self.cells} ячеек, {self.cells_per_second:.0f} ячеек/с'
+        if self.failed_cells:
+            summary += f', не записано: {self.failed_cells}'
+        return summary
+
+
+class IncompleteSheetWrite(Exception):
+    """
+    Исключение, возникающее, если часть блоков не удалось записать в лист Google Sheets.
+    Загрузка ресурса с таким итогом не считается успешной, чтобы следующая загрузка
+    не получила NotModified и дописала лист.
+    """
+    def __init__(self, sheet_name: str, stats: WriteStats):
+        super().__init__(f'Не удалось записать в лист {sheet_name} {stats.failed_cells} ячеек')
+        self.sheet_name = sheet_name
+        self.stats = stats
+
+
+class ChunkedSheetWriter:
+    """
+    Записывает строки в лист Google Sheets блоками ограниченного размера, параллельно.
+
+    Каждый блок пишется в явно заданный диапазон, поэтому блоки не зависят друг от друга
+    и отправляются одновременно (не более concurrency запросов); ошибки квоты, сервера
+    и сети повторяет планировщик клиента. Если какие-то блоки так и не удалось записать,
+    остальные дописываются, а close завершается ошибкой IncompleteSheetWrite.
+    Сетка листа заранее расширяется под записываемые строки. В памяти одновременно
+    находятся только отправляемые блоки: write ждет, пока освободится место.
+
+    Атрибуты:
+        sheet_name (str): Название листа.
+        start_row (int): Номер строки (с 1), с которой начинается запись.
+        max_cells (int): Максимальное количество ячеек в одном блоке.
+        concurrency (int): Максимальное количество одновременно отправляемых блоков.
+        stats (WriteStats): Итог записи.
+
+    Методы:
+        write(rows): Разбивает строки на блоки и ставит их в очередь отправки.
+        close(): Дожидается отправки всех блоков и возвращает итог записи.
+        abort(): Отменяет отправку блоков, например при ошибке загрузки.
+
+    Исключения:
+        IncompleteSheetWrite: Если при закрытии часть блоков не удалось записать.
+    """
+    def __init__(self, sheet_name: str, start_row: int = 1, max_cells: int = CHUNK_CELLS,
+                 concurrency: int = WRITE_CONCURRENCY,
+                 client: Optional[RateLimitedSheetsClient] = None, metadata: Optional[SpreadsheetMetadataCache] = None):
+        self.sheet_name = sheet_name
+        self.next_row = start_row
+        self.max_cells = max_cells
+        self.concurrency = concurrency
+        self.client = client or get_sheets_client()
+        self.metadata = metadata or get_metadata_cache()
+        self.stats = WriteStats()
+        self._started = time.perf_counter()
+        self._grid_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def write(self, rows: List[List[Any]]):
+        if not rows:
+            return
+        width = max(len(row) for row in rows) or 1
+        rows_per_chunk = max(1, self.max_cells // width)
+        for start in range(0, len(rows), rows_per_chunk):
+            chunk = rows[start:start + rows_per_chunk]
+            while len(self._tasks) >= self.concurrency:
+                done, _ = await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                self._tasks -= done
+            task = asyncio.create_task(self._send(self.next_row, chunk, width))
+            self._tasks.add(task)
+            self.next_row += len(chunk)
+
+    async def close(self) -> WriteStats:
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+            self._tasks.clear()
+        self.stats.elapsed = time.perf_counter() - self._started
+        if self.stats.failed_cells:
+            raise IncompleteSheetWrite(self.sheet_name, self.stats)
+        return self.stats
+
+    async def abort(self):
+        # Блоки прерванной загрузки не должны дописываться в лист после того, как ее блокировка снята:
+        # иначе они перезапишут данные следующей загрузки.
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _send(self, row: int, chunk: List[List[Any]], width: int):
+        cells = len(chunk) * width
+        for attempt in range(2):
+            try:
+                sheet = await self._ensure_grid(row + len(chunk) - 1, width)
+                if WRITE_MODE == 'batch':
+                    await self.client.batch_update([{
+                        'updateCells': {
+                            'start': {'sheetId': sheet.sheet_id, 'rowIndex': row - 1, 'columnIndex': 0},
+                            'rows': row_data(chunk),
+                            'fields': 'userEnteredValue'
+                        }
+                    }])
+                else:
+                    await self.client.values_update(f"'{self.sheet_name}'!A{row}", chunk)
+                self.stats.cells += cells
+                self.stats.chunks += 1
+                return
+            except Exception as error:
+                if attempt or not is_range_not_found(error):
+                    self.stats.failed_cells += cells
+                    return
+                self.metadata.invalidate()
+
+    async def _ensure_grid(self, rows: int, columns: int) -> SheetProperties:
+        async with self._grid_lock:
+            sheet = await self.metadata.get_sheet(self.sheet_name)
+            if sheet is None:
+                raise ValueError(f'Лист {self.sheet_name} не найден')
+            if sheet.row_count >= rows and sheet.column_count >= columns:
+                return sheet
+            # Сетка расширяется сразу до конца всех уже поставленных в очередь блоков, чтобы
+            # не расширять ее на каждый блок, но не дальше строк, которые действительно будут записаны.
+            row_count = max(sheet.row_count, rows, self.next_row - 1)
+            column_count = max(sheet.column_count, columns)
+            await self.client.batch_update([{
+                'updateSheetProperties': {
+                    'properties': {
+                        'sheetId': sheet.sheet_id,
+                        'gridProperties': {'rowCount': row_count, 'columnCount': column_count}
+                    },
+                    'fields': 'gridProperties(rowCount,columnCount)'
+                }
+            }])
+            self.metadata.grow(self.sheet_name, row_count, column_count)
+            return sheet
+
+
+@dataclass
+class DiffStats:
+    """
+    Итог инкрементальной записи данных в лист Google Sheets.
+
+    Атрибуты:
+        updated (int): Количество перезаписанных измененных строк.
+        appended (int): Количество добавленных строк.
+        deleted (int): Количество удаленных строк.
+        unchanged (int): Количество строк без изменений.
+        cells (int): Количество записанных ячеек.
+    """
+    updated: int = 0
+    appended: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    cells: int = 0
+
+    def __str__(self):
+        return (f'изменено строк: {self.updated}, добавлено: {self.appended}, '
+                f'удалено: {self.deleted}, без изменений: {self.unchanged}, записано ячеек: {self.cells}')
+
+
+class SheetDiffWriter:
+    """
+    Инкрементально обновляет лист Google Sheets: перезаписывает только измененные строки,
+    дописывает новые и удаляет исчезнувшие.
+
+    При открытии читает текущее содержимое листа и запоминает для каждого значения ключевого
+    столбца номер строки и хэш ее содержимого; сами строки в памяти не хранятся.
+    Измененные строки отправляются пачками через values.batchUpdate, новые дописываются
+    ChunkedSheetWriter после последней строки листа, удаленные строки убираются запросами
+    deleteDimension от конца листа к началу, чтобы номера оставшихся строк не сдвигались.
+    Если заголовки листа не совпадают с ожидаемыми, лист перезаписывается целиком.
+
+    Атрибуты:
+        sheet_name (str): Название листа.
+        headers (List[str]): Заголовки столбцов листа.
+        key_column (int): Номер столбца (с 0) с ключом строки.
+        stats (DiffStats): Итог записи.
+
+    Методы:
+        start(): Читает текущее содержимое листа.
+        write(rows): Сравнивает строки с содержимым листа и ставит изменения в очередь записи.
+        close(): Записывает оставшиеся изменения, удаляет исчезнувшие строки и возвращает итог.
+        abort(): Отменяет дописывание новых строк, например при ошибке загрузки.
+    """
+    def __init__(self, sheet_name: str, headers: List[str], key: str = 'id', max_cells: int = CHUNK_CELLS,
+                 client: Optional[RateLimitedSheetsClient] = None, metadata: Optional[SpreadsheetMetadataCache] = None):
+        self.sheet_name = sheet_name
+        self.headers = headers
+        self.key_column = headers.index(key)
+        self.max_cells = max_cells
+        self.client = client or get_sheets_client()
+        self.metadata = metadata or get_metadata_cache()
+        self.stats = DiffStats()
+        self._existing: Dict[Any, Tuple[int, str]] = {}
+        self._duplicates: List[int] = []
+        self._seen: Set[Any] = set()
+        self._updates: List[Dict] = []
+        self._update_cells = 0
+        self._appender: Optional[ChunkedSheetWriter] = None
+
+    async def start(self):
+        sheet = await self.metadata.get_sheet(self.sheet_name)
+        values = []
+        if sheet is not None:
+            reply = await self.client.values_get(sheet.sheet_range)
+            values = reply.get('values', [])
+
+        if not values or normalize_row(values[0]) != normalize_row(self.headers):
+            await write_to_google_sheets([self.headers], self.sheet_name)
+            values = [self.headers]
+
+        for number, row in enumerate(values[1:], start=2):
+            row = normalize_row(row)
+            key = row[self.key_column] if len(row) > self.key_column else ''
+            if key == '' or key in self._existing:
+                self._duplicates.append(number)
+                continue
+            self._existing[key] = (number, row_hash(row))
+
+        self._appender = ChunkedSheetWriter(
+            self.sheet_name, start_row=len(values) + 1, max_cells=self.max_cells,
+            client=self.client, metadata=self.metadata
+        )
+
+    async def write(self, rows: List[List[Any]]):
+        appended = []
+        for row in rows:
+            key = normalize_row([row[self.key_column]])[0]
+            self._seen.add(key)
+            existing = self._existing.get(key)
+            if existing is None:
+                appended.append(row)
+                continue
+            number, digest = existing
+            if digest == row_hash(row):
+                self.stats.unchanged += 1
+                continue
+            self._updates.append({'range': f"'{self.sheet_name}'!A{number}", 'values': [row]})
+            self._update_cells += len(row)
+            self.stats.updated += 1
+            if self._update_cells >= self.max_cells:
+                await self._flush()
+
+        if appended:
+            self.stats.appended += len(appended)
+            self.stats.cells += sum(len(row) for row in appended)
+            await self._appender.write(appended)
+
+    async def close(self) -> DiffStats:
+        await self._flush()
+        await self._appender.close()
+
+        removed = sorted(
+            [number for key, (number, _) in self._existing.items() if key not in self._seen] + self._duplicates,
+            reverse=True
+        )
+        if removed:
+            sheet = await self.metadata.get_sheet(self.sheet_name)
+            requests = []
+            for end, start in self._ranges(removed):
+                requests.append({
+                    'deleteDimension': {
+                        'range': {
+                            'sheetId': sheet.sheet_id,
+                            'dimension': 'ROWS',
+                            'startIndex': start - 1,
+                            'endIndex': end
+                        }
+                    }
+                })
+            await self.client.batch_update(requests)
+            self.metadata.invalidate()
+            self.stats.deleted = len(removed)
+        return self.stats
+
+    async def abort(self):
+        self._updates = []
+        self._update_cells = 0
+        if self._appender is not None:
+            await self._appender.abort()
+
+    async def _flush(self):
+        if not self._updates:
+            return
+        await self.client.values_batch_update(self._updates)
+        self.stats.cells += self._update_cells
+        self._updates = []
+        self._update_cells = 0
+
+    @staticmethod
+    def _ranges(numbers: List[int]) -> List[Tuple[int, int]]:
+        """
+        Группирует номера строк, отсортированные по убыванию, в непрерывные диапазоны (конец, начало).
+        """
+        ranges = []
+        for number in numbers:
+            if ranges and ranges[-1][1] == number + 1:
+                ranges[-1] = (ranges[-1][0], number)
+            else:
+                ranges.append((number, number))
+        return ranges
+
+
+async def open_sheet_writer(sheet_name: str, headers: List[str], mode: str = SHEETS_SYNC_MODE):
+    """
+    Подготавливает лист к записи данных ресурса и возвращает объект для записи строк.
+
+    Параметры:
+        sheet_name (str): Название листа.
+        headers (List[str]): Заголовки столбцов листа.
+        mode (str): 'full' — лист очищается и заполняется заново,
+            'diff' — перезаписываются только измененные строки.
+
+    Возвращает:
+        ChunkedSheetWriter | SheetDiffWriter: Объект с методами write(rows), close() и abort().
+    """
+    if mode == 'diff':
+        writer = SheetDiffWriter(sheet_name, headers)
+        await writer.start()
+        return writer
+    await write_to_google_sheets([headers], sheet_name)
+    return ChunkedSheetWriter(sheet_name, start_row=2)
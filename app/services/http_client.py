@@ -0,0 +1,67 @@
+import aiohttp
+from typing import Optional
+
+from app.services.config import Config, load_config
+
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def create_http_session(config: Config) -> aiohttp.ClientSession:
+    """
+    Создает HTTP-сессию с пулом соединений для запросов к API.
+
+    Параметры:
+        config (Config): Конфигурация приложения с лимитами и таймаутами HTTP-клиента.
+
+    Возвращает:
+        aiohttp.ClientSession: Сессия с ограниченным пулом keep-alive соединений и кэшем DNS.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.http_limit,
+        limit_per_host=config.http_limit_per_host,
+        keepalive_timeout=config.http_keepalive_timeout,
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(total=config.http_timeout, connect=config.http_connect_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def init_http_session(config: Config) -> aiohttp.ClientSession:
+    """
+    Создает общую для приложения HTTP-сессию. Вызывается при запуске приложения.
+
+    Параметры:
+        config (Config): Конфигурация приложения.
+
+    Возвращает:
+        aiohttp.ClientSession: Созданная сессия.
+    """
+    global _session
+    await close_http_session()
+    _session = create_http_session(config)
+    return _session
+
+
+async def close_http_session():
+    """
+    Закрывает общую HTTP-сессию и ее соединения. Вызывается при завершении работы приложения.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Возвращает общую HTTP-сессию, создавая ее при первом обращении
+    (например, при запуске скриптов без веб-приложения).
+
+    Возвращает:
+        aiohttp.ClientSession: Общая сессия.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = create_http_session(load_config())
+    return _session
@@ -0,0 +1,230 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from aiogram import Bot
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.db import AsyncSessionLocal, async_engine
+from app.database.dao import SyncJobDAO
+from app.database.locks import LockNotAcquired
+from app.database.models import SyncJob
+from app.services.config import Config
+from app.services.google_sheets_service import IncompleteSheetWrite, sheets_scheduler_stats
+from app.services.sync_service import RESOURCES, sync_resource, sync_all_resources
+from app.services.utils import NotModified, cache_stats
+
+
+SYNC_ALL = 'all'
+
+
+async def describe_resource_sync(key: str) -> str:
+    """
+    Загружает один ресурс и возвращает сообщение с итогом для пользователя.
+
+    Параметры:
+        key (str): Ключ ресурса в RESOURCES.
+
+    Возвращает:
+        str: Текст сообщения.
+    """
+    resource = RESOURCES[key]
+    try:
+        count, report = await sync_resource(resource)
+    except NotModified:
+        return (f'Данные {resource.subject} не изменились с прошлой загрузки. '
+                f'Доля ответов API из кэша: {cache_stats.hit_ratio:.0%}')
+    except LockNotAcquired:
+        return f'Данные {resource.subject} сейчас загружает другой процесс. Попробуйте позже.'
+    except IncompleteSheetWrite as error:
+        return (f'Данные {resource.subject} записаны не полностью: в гугл таблицы не записано '
+                f'{error.stats.failed_cells} ячеек. Попробуйте загрузить их еще раз.')
+    return (f'Данные {resource.subject} успешно записаны в базу данных и в гугл таблицы! '
+            f'Количество записей: {count}\n{report}')
+
+
+async def describe_sync_all() -> str:
+    """
+    Загружает все ресурсы одновременно и возвращает сводку с результатом и временем загрузки
+    каждого ресурса и метриками очередей запросов к Google Sheets.
+
+    Возвращает:
+        str: Текст сообщения.
+    """
+    started = time.perf_counter()
+    results = await sync_all_resources()
+    lines = [f'{title}: {result} ({elapsed:.1f} с)' for title, result, elapsed in results]
+    lines.append(f'Общее время: {time.perf_counter() - started:.1f} с')
+    lines.extend(f'Google Sheets, {kind}: {stats}' for kind, stats in sheets_scheduler_stats().items())
+    return '\n'.join(lines)
+
+
+def describe_job(resource: str) -> str:
+    """
+    Возвращает описание задачи для сообщений пользователю: 'данные о постах', 'все данные'.
+    """
+    if resource == SYNC_ALL:
+        return 'все данные'
+    return f'данные {RESOURCES[resource].subject}'
+
+
+class JobQueue:
+    """
+    Очередь фоновых задач синхронизации, хранящаяся в Postgres.
+
+    Обработчики бота только ставят задачу в очередь и сразу отвечают, а загрузку выполняют
+    обработчики очереди (workers) — фоновые задачи asyncio, которые забирают задачи из таблицы
+    sync_jobs и отправляют ход и итог выполнения в чат. Выполняемую задачу защищает
+    advisory-блокировка соединения обработчика, поэтому при запуске в очередь возвращаются
+    только задачи, прерванные остановкой процесса, а не выполняемые другими процессами.
+
+    Атрибуты:
+        bot (Bot): Бот для отправки сообщений в чат.
+        workers (int): Количество одновременно выполняемых задач.
+        poll_interval (float): Как часто проверять таблицу задач, если о новых задачах не сообщали.
+
+    Методы:
+        start(): Возвращает прерванные задачи в очередь и запускает обработчики.
+        stop(): Останавливает обработчики.
+        enqueue(resource, chat_id): Ставит задачу в очередь.
+    """
+    def __init__(self, bot: Bot, workers: int, poll_interval: float):
+        self.bot = bot
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        async with AsyncSessionLocal() as session:
+            await SyncJobDAO(session).requeue_running()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, resource: str, chat_id: int) -> SyncJob:
+        """
+        Ставит задачу синхронизации в очередь.
+
+        Параметры:
+            resource (str): Ключ ресурса в RESOURCES или SYNC_ALL.
+            chat_id (int): Чат, в который отправляются ход и итог выполнения.
+
+        Возвращает:
+            SyncJob: Созданная задача.
+        """
+        async with AsyncSessionLocal() as session:
+            job = await SyncJobDAO(session).enqueue(resource, chat_id)
+        self._wakeup.set()
+        return job
+
+    async def _work(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                async with job_session() as session:
+                    jobs = SyncJobDAO(session)
+                    job = await jobs.claim()
+                    if job is not None:
+                        await self._run(job, jobs)
+            except Exception:
+                # Если итог не удалось сохранить, задача остается в статусе running, а соединение
+                # с ее блокировкой закрыто: requeue_running вернет задачу в очередь при следующем запуске.
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _run(self, job: SyncJob, jobs: SyncJobDAO):
+        status, result = 'done', None
+        try:
+            await self.bot.send_message(job.chat_id, f'Задача №{job.id}: {describe_job(job.resource)} записываются...')
+            if job.resource == SYNC_ALL:
+                result = await describe_sync_all()
+            else:
+                result = await describe_resource_sync(job.resource)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            status = 'failed'
+            result = 'Произошла ошибка при обработке запроса. Пожалуйста, попробуйте позже.'
+
+        await jobs.finish(job.id, status, result)
+        try:
+            await self.bot.send_message(job.chat_id, f'Задача №{job.id}: {result}')
+        except Exception:
+            pass
+
+
+@asynccontextmanager
+async def job_session() -> AsyncIterator[AsyncSession]:
+    """
+    Открывает сессию, привязанную к одному соединению на все время выполнения задачи,
+    чтобы advisory-блокировка задачи, взятая в claim, держалась до finish.
+
+    Если выполнение прервано ошибкой или остановкой, соединение закрывается, а не возвращается
+    в пул: Postgres снимает блокировку задачи, и другие процессы могут вернуть ее в очередь.
+
+    Возвращает:
+        AsyncSession: Сессия для SyncJobDAO.
+    """
+    async with async_engine.connect() as connection:
+        try:
+            async with AsyncSession(connection, expire_on_commit=False) as session:
+                yield session
+        except BaseException:
+            await connection.invalidate()
+            raise
+
+
+_queue: Optional[JobQueue] = None
+
+
+async def init_job_queue(bot: Bot, config: Config) -> JobQueue:
+    """
+    Создает очередь задач и запускает ее обработчики. Вызывается при запуске приложения.
+
+    Параметры:
+        bot (Bot): Бот для отправки сообщений в чат.
+        config (Config): Конфигурация приложения.
+
+    Возвращает:
+        JobQueue: Запущенная очередь задач.
+    """
+    global _queue
+    await close_job_queue()
+    _queue = JobQueue(bot, config.job_workers, config.job_poll_interval)
+    await _queue.start()
+    return _queue
+
+
+async def close_job_queue():
+    """
+    Останавливает обработчики очереди задач. Вызывается при завершении работы приложения.
+    """
+    global _queue
+    if _queue is not None:
+        await _queue.stop()
+    _queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Возвращает запущенную очередь задач.
+
+    Возвращает:
+        JobQueue: Очередь задач.
+
+    Исключения:
+        RuntimeError: Если очередь задач не запущена.
+    """
+    if _queue is None:
+        raise RuntimeError('Очередь задач не запущена')
+    return _queue
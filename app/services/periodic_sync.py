@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from app.database.locks import HeldLock, LockNotAcquired, advisory_lock
+from app.services.config import Config
+from app.services.rate_limiter import PRIORITY_LOW, priority
+from app.services.sync_service import RESOURCES, Resource, sync_flights, sync_resource
+
+
+LEADER_LOCK = 'periodic_sync'
+
+
+class PeriodicSync:
+    """
+    Планировщик периодической загрузки ресурсов, каждого со своим интервалом.
+
+    Планировщик работает только в одном процессе: процесс, получивший advisory-блокировку
+    Postgres, становится ведущим, остальные периодически пробуют ее получить и подхватывают
+    работу, если ведущий процесс остановился. Ведущий процесс каждые check_interval секунд
+    проверяет соединение, которому принадлежит блокировка, и при его потере останавливает
+    загрузки по расписанию, чтобы не работать одновременно с новым ведущим. Первые загрузки
+    ресурсов разнесены во времени на stagger секунд, а интервалы случайно отклоняются на долю
+    jitter, чтобы загрузки не совпадали и не создавали пиков нагрузки на базу данных и квоту
+    Google Sheets.
+    Загрузка пропускается, если ресурс уже загружается (например, по кнопке пользователя),
+    а пропущенные из-за долгой загрузки запуски не наверстываются. Запросы к API условные,
+    запросы к Google Sheets отправляются с низким приоритетом.
+
+    Атрибуты:
+        intervals (Dict[str, int]): Интервалы загрузки ресурсов в секундах.
+        stagger (float): Сдвиг первой загрузки каждого следующего ресурса в секундах.
+        jitter (float): Доля интервала, на которую случайно отклоняется время запуска.
+        election_interval (float): Как часто процесс, не ставший ведущим, пробует получить блокировку.
+        check_interval (float): Как часто ведущий процесс проверяет, что блокировка за ним.
+
+    Методы:
+        start(): Запускает планировщик.
+        stop(): Останавливает планировщик.
+    """
+    def __init__(self, intervals: Dict[str, int], stagger: float, jitter: float,
+                 election_interval: float = 60, check_interval: float = 10):
+        self.intervals = {key: interval for key, interval in intervals.items() if interval > 0 and key in RESOURCES}
+        self.stagger = stagger
+        self.jitter = jitter
+        self.election_interval = election_interval
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.intervals:
+            self._task = asyncio.create_task(self._lead())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _lead(self):
+        while True:
+            try:
+                async with advisory_lock(LEADER_LOCK, wait=False) as lock:
+                    await self._run_schedules(lock)
+            except LockNotAcquired:
+                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Проверка блокировки не прошла: загрузки по расписанию уже остановлены, соединение
+                # закрыто и Postgres снял блокировку; процесс снова участвует в выборах ведущего.
+                pass
+            await asyncio.sleep(self.election_interval)
+
+    async def _run_schedules(self, lock: HeldLock):
+        tasks: List[asyncio.Task] = [
+            asyncio.create_task(self._schedule(RESOURCES[key], interval, index * self.stagger))
+            for index, (key, interval) in enumerate(self.intervals.items())
+        ]
+        tasks.append(asyncio.create_task(self._watch(lock)))
+        try:
+            # Расписания не завершаются сами, поэтому gather возвращается только с ошибкой проверки блокировки.
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _watch(self, lock: HeldLock):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await lock.check(timeout=self.check_interval)
+
+    def _spread(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _schedule(self, resource: Resource, interval: int, delay: float):
+        await asyncio.sleep(delay + random.uniform(0, self.jitter * interval))
+        while True:
+            started = time.monotonic()
+            await self._sync(resource)
+            # Если загрузка длилась дольше интервала, следующая начинается сразу, без наверстывания пропущенных.
+            await asyncio.sleep(max(0.0, self._spread(interval) - (time.monotonic() - started)))
+
+    async def _sync(self, resource: Resource):
+        if sync_flights.running(resource.endpoint):
+            return
+        try:
+            with priority(PRIORITY_LOW):
+                await sync_resource(resource)
+        except Exception:
+            # NotModified, LockNotAcquired и ошибки загрузки не останавливают расписание:
+            # ресурс загрузится в следующий раз.
+            pass
+
+
+_scheduler: Optional[PeriodicSync] = None
+
+
+async def init_periodic_sync(config: Config) -> PeriodicSync:
+    """
+    Создает и запускает планировщик периодической загрузки. Вызывается при запуске приложения.
+
+    Параметры:
+        config (Config): Конфигурация приложения.
+
+    Возвращает:
+        PeriodicSync: Запущенный планировщик.
+    """
+    global _scheduler
+    await close_periodic_sync()
+    intervals = {key: config.sync_intervals.get(key, config.sync_default_interval) for key in RESOURCES}
+    _scheduler = PeriodicSync(intervals, config.sync_stagger, config.sync_jitter)
+    await _scheduler.start()
+    return _scheduler
+
+
+async def close_periodic_sync():
+    """
+    Останавливает планировщик периодической загрузки. Вызывается при завершении работы приложения.
+    """
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+    _scheduler = None
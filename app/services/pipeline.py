@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, List, Sequence
+
+
+_DONE = object()
+
+Stage = Callable[[AsyncIterator[Any]], Awaitable[Any]]
+
+
+async def _drain(queue: asyncio.Queue) -> AsyncIterator[Any]:
+    """
+    Выдает элементы очереди, пока источник не сообщит о завершении.
+    """
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+async def run_pipeline(source: AsyncIterable[Any], stages: Sequence[Stage], queue_size: int) -> List[Any]:
+    """
+    Раздает элементы источника нескольким стадиям, работающим одновременно.
+
+    Каждая стадия получает свою очередь ограниченного размера и читает ее как асинхронный итератор,
+    поэтому стадии обрабатывают разные элементы параллельно, а источник не уходит вперед
+    самой медленной стадии больше чем на queue_size элементов.
+    Если источник или любая стадия завершились ошибкой, остальные стадии отменяются,
+    так что стадия записи в базу данных не фиксирует неполные данные.
+
+    Параметры:
+        source (AsyncIterable): Источник элементов (например, пачек записей API).
+        stages (Sequence[Stage]): Стадии: функции, принимающие асинхронный итератор элементов.
+        queue_size (int): Размер очереди перед каждой стадией.
+
+    Возвращает:
+        List[Any]: Результаты стадий в порядке их перечисления.
+
+    Исключения:
+        Exception: Первая ошибка источника или стадии.
+    """
+    queues = [asyncio.Queue(queue_size) for _ in stages]
+
+    async def produce():
+        async for item in source:
+            for queue in queues:
+                await queue.put(item)
+        for queue in queues:
+            await queue.put(_DONE)
+
+    consumers = [asyncio.create_task(stage(_drain(queue))) for stage, queue in zip(stages, queues)]
+    tasks = [asyncio.create_task(produce()), *consumers]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return [consumer.result() for consumer in consumers]
@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+request_priority: contextvars.ContextVar = contextvars.ContextVar('request_priority', default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def priority(value: int):
+    """
+    Задает приоритет запросов, отправляемых через планировщики внутри блока with
+    (например, запросы фоновой синхронизации можно пропускать после запросов пользователя).
+
+    Параметры:
+        value (int): PRIORITY_HIGH, PRIORITY_NORMAL или PRIORITY_LOW.
+    """
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Ведро токенов: пополняется со скоростью rate токенов в секунду и вмещает не больше capacity.
+
+    Методы:
+        delay(): Возвращает, сколько секунд ждать до появления токена.
+        take(): Забирает один токен.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Метрики планировщика запросов.
+
+    Атрибуты:
+        requests (int): Количество выполненных попыток запросов.
+        retries (int): Количество повторов после временных ошибок.
+        failures (int): Количество запросов, завершившихся ошибкой.
+        queue_depth (int): Текущее количество запросов в очереди.
+        max_queue_depth (int): Наибольшая длина очереди.
+        total_wait (float): Суммарное время ожидания в очереди, в секундах.
+        max_wait (float): Наибольшее время ожидания в очереди, в секундах.
+    """
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+    def __str__(self):
+        return (f'запросов: {self.requests}, повторов: {self.retries}, ошибок: {self.failures}, '
+                f'в очереди: {self.queue_depth} (макс. {self.max_queue_depth}), '
+                f'ожидание: в среднем {self.average_wait:.2f} с, макс. {self.max_wait:.2f} с')
+
+
+class RequestScheduler:
+    """
+    Планировщик запросов к API с квотой: очередь с приоритетами перед ведром токенов.
+
+    Запросы ждут в очереди, пока в ведре не появится токен, и выпускаются в порядке приоритета,
+    а при равном приоритете — в порядке поступления. Запрос, завершившийся временной ошибкой,
+    повторяется с экспоненциальной задержкой со случайным разбросом и снова встает в очередь.
+
+    Атрибуты:
+        bucket (TokenBucket): Ведро токенов, задающее темп запросов.
+        retries (int): Количество повторов одного запроса.
+        stats (SchedulerStats): Метрики очереди.
+
+    Методы:
+        submit(call, retryable, priority): Выполняет запрос в порядке очереди с повторами.
+    """
+    def __init__(self, per_minute: float, burst: float, retries: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 64.0):
+        self.bucket = TokenBucket(per_minute / 60, burst)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = SchedulerStats()
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def submit(self, call: Callable[[], Awaitable[Any]], retryable: Callable[[Exception], bool],
+                     priority: Optional[int] = None) -> Any:
+        """
+        Выполняет запрос, дождавшись своей очереди.
+
+        Параметры:
+            call (Callable): Функция без аргументов, возвращающая корутину запроса.
+            retryable (Callable): Проверка, что ошибку запроса можно повторить.
+            priority (Optional[int]): Приоритет, по умолчанию из контекста (request_priority).
+
+        Возвращает:
+            Any: Результат запроса.
+
+        Исключения:
+            Exception: Ошибка запроса, если она не временная или повторы исчерпаны.
+        """
+        if priority is None:
+            priority = request_priority.get()
+        for attempt in range(self.retries + 1):
+            await self._acquire(priority)
+            self.stats.requests += 1
+            try:
+                return await call()
+            except Exception as error:
+                if attempt == self.retries or not retryable(error):
+                    self.stats.failures += 1
+                    raise
+                self.stats.retries += 1
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    async def _acquire(self, priority: int):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), future))
+        self.stats.queue_depth = len(self._queue)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+
+    async def _dispatch(self):
+        while self._queue:
+            delay = self.bucket.delay()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._queue)
+            self.stats.queue_depth = len(self._queue)
+            if future.cancelled():
+                continue
+            self.bucket.take()
+            future.set_result(None)
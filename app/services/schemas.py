@@ -1,14 +1,24 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
 
 
-class PostValidate(BaseModel):
+class CamelModel(BaseModel):
+    """
+    Базовая модель для данных API: поля объявляются в snake_case, а при валидации
+    читаются напрямую из ключей camelCase (userId -> user_id) без предварительного
+    преобразования словаря. Имена в snake_case также принимаются.
+    """
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+class PostValidate(CamelModel):
     user_id: int
     id: int
     title: str
     body: str
 
 
-class CommentValidate(BaseModel):
+class CommentValidate(CamelModel):
     post_id: int
     id: int
     name: str
@@ -16,7 +26,7 @@ class CommentValidate(BaseModel):
     body: str
 
 
-class PhotoValidate(BaseModel):
+class PhotoValidate(CamelModel):
     album_id: int
     id: int
     title: str
@@ -24,25 +34,25 @@ class PhotoValidate(BaseModel):
     thumbnail_url: str
 
 
-class AlbumValidate(BaseModel):
+class AlbumValidate(CamelModel):
     user_id: int
     id: int
     title: str
 
 
-class TodoValidate(BaseModel):
+class TodoValidate(CamelModel):
     user_id: int
     id: int
     title: str
     completed: bool
 
 
-class GeoValidate(BaseModel):
+class GeoValidate(CamelModel):
     lat: str
     lng: str
 
 
-class AddressValidate(BaseModel):
+class AddressValidate(CamelModel):
     street: str
     suite: str
     city: str
@@ -50,13 +60,13 @@ class AddressValidate(BaseModel):
     geo: GeoValidate
 
 
-class CompanyValidate(BaseModel):
+class CompanyValidate(CamelModel):
     name: str
     catch_phrase: str
     bs: str
 
 
-class UserValidate(BaseModel):
+class UserValidate(CamelModel):
     id: int
     name: str
     username: str
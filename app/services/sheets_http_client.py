@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httplib2
+from google.auth import crypt, jwt
+from googleapiclient.errors import HttpError
+
+from app.services.http_client import get_http_session
+
+
+SHEETS_API_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+TOKEN_LIFETIME = 3600
+TOKEN_REFRESH_MARGIN = 60
+
+
+class AioSheetsClient:
+    """
+    Асинхронный клиент Google Sheets API поверх aiohttp.
+
+    Обращается к REST API напрямую через общую HTTP-сессию приложения, поэтому запросы
+    не занимают потоки пула и переиспользуют keep-alive соединения. Токен доступа
+    получается обменом подписанного JWT сервисного аккаунта и обновляется асинхронно
+    незадолго до истечения или после ответа 401. Методы и ошибки (HttpError) совпадают
+    с SheetsClient, так что клиенты взаимозаменяемы.
+
+    Атрибуты:
+        spreadsheet_id (str): Идентификатор таблицы.
+
+    Методы:
+        get(fields): Возвращает метаданные таблицы.
+        batch_update(requests): Выполняет spreadsheets.batchUpdate.
+        values_clear(range_name): Очищает диапазон.
+        values_update(range_name, values): Записывает значения в диапазон.
+        values_get(range_name): Читает значения диапазона без форматирования.
+        values_batch_update(data): Записывает значения в несколько диапазонов одним запросом.
+    """
+    def __init__(self, credentials_file: str, spreadsheet_id: str, scopes: List[str]):
+        self.credentials_file = credentials_file
+        self.spreadsheet_id = spreadsheet_id
+        self.scopes = scopes
+        self._info: Optional[Dict] = None
+        self._signer: Optional[crypt.Signer] = None
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def access_token(self, force: bool = False) -> str:
+        """
+        Возвращает действующий токен доступа, при необходимости получая новый.
+        """
+        async with self._lock:
+            if force or self._token is None or time.time() > self._expires_at - TOKEN_REFRESH_MARGIN:
+                await self._refresh()
+            return self._token
+
+    async def _refresh(self):
+        if self._info is None:
+            with open(self.credentials_file, encoding='utf-8') as file:
+                self._info = json.load(file)
+            self._signer = crypt.RSASigner.from_service_account_info(self._info)
+
+        now = int(time.time())
+        assertion = jwt.encode(self._signer, {
+            'iss': self._info['client_email'],
+            'scope': ' '.join(self.scopes),
+            'aud': self._info['token_uri'],
+            'iat': now,
+            'exp': now + TOKEN_LIFETIME,
+        })
+        async with get_http_session().post(self._info['token_uri'], data={
+            'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
+            'assertion': assertion.decode('utf-8'),
+        }) as response:
+            content = await response.read()
+            if response.status != 200:
+                raise HttpError(httplib2.Response({'status': response.status}), content, uri=self._info['token_uri'])
+        token = json.loads(content)
+        self._token = token['access_token']
+        self._expires_at = now + token.get('expires_in', TOKEN_LIFETIME)
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None, body: Any = None) -> Dict:
+        url = f'{SHEETS_API_URL}/{self.spreadsheet_id}{path}'
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        for attempt in range(2):
+            headers = {'Authorization': f'Bearer {await self.access_token(force=bool(attempt))}'}
+            async with get_http_session().request(method, url, params=params, json=body, headers=headers) as response:
+                content = await response.read()
+                if response.status == 401 and not attempt:
+                    continue
+                if response.status >= 400:
+                    raise HttpError(httplib2.Response({'status': response.status}), content, uri=url)
+                return json.loads(content) if content else {}
+
+    @staticmethod
+    def _range(range_name: str) -> str:
+        return quote(range_name, safe='')
+
+    async def get(self, fields: Optional[str] = None) -> Dict:
+        return await self._request('GET', '', params={'fields': fields})
+
+    async def batch_update(self, requests: List[Dict]) -> Dict:
+        return await self._request('POST', ':batchUpdate', body={'requests': requests})
+
+    async def values_clear(self, range_name: str) -> Dict:
+        return await self._request('POST', f'/values/{self._range(range_name)}:clear', body={})
+
+    async def values_update(self, range_name: str, values: List[List[Any]]) -> Dict:
+        return await self._request(
+            'PUT', f'/values/{self._range(range_name)}',
+            params={'valueInputOption': 'RAW'}, body={'values': values}
+        )
+
+    async def values_get(self, range_name: str) -> Dict:
+        return await self._request(
+            'GET', f'/values/{self._range(range_name)}', params={'valueRenderOption': 'UNFORMATTED_VALUE'}
+        )
+
+    async def values_batch_update(self, data: List[Dict]) -> Dict:
+        return await self._request('POST', '/values:batchUpdate', body={'valueInputOption': 'RAW', 'data': data})
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные одинаковые операции: пока операция с ключом выполняется,
+    повторные вызовы с тем же ключом не запускают ее заново, а ждут и получают тот же результат
+    (или ту же ошибку). Успешный результат дополнительно переиспользуется в течение окна
+    debounce после завершения, чтобы серия повторных нажатий не запускала повторную загрузку.
+
+    Операция выполняется в отдельной задаче asyncio, поэтому отмена одного из ожидающих
+    не прерывает ее для остальных.
+
+    Атрибуты:
+        debounce (float): Сколько секунд после завершения выдавать готовый результат без нового запуска.
+
+    Методы:
+        run(key, operation): Выполняет операцию или присоединяется к уже выполняемой.
+        running(key): Проверяет, выполняется ли операция с ключом.
+    """
+    def __init__(self, debounce: float = 0.0):
+        self.debounce = debounce
+        self._running: Dict[Hashable, asyncio.Task] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+
+    async def run(self, key: Hashable, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет операцию с ключом key, если такая же операция еще не выполняется.
+
+        Параметры:
+            key (Hashable): Ключ операции, например название ресурса.
+            operation (Callable): Функция без аргументов, возвращающая корутину операции.
+
+        Возвращает:
+            Any: Результат операции.
+        """
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] < self.debounce:
+            return recent[1]
+
+        task = self._running.get(key)
+        if task is None:
+            task = asyncio.create_task(operation())
+            self._running[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._running.get(key) is task:
+            del self._running[key]
+        if self.debounce and not task.cancelled() and task.exception() is None:
+            self._recent[key] = (time.monotonic(), task.result())
+
+    def running(self, key: Hashable) -> bool:
+        """
+        Проверяет, выполняется ли сейчас операция с ключом key.
+        """
+        return key in self._running
@@ -0,0 +1,296 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Callable, List, NamedTuple, Optional, Tuple, Union
+
+from app.database.db import AsyncSessionLocal
+from app.database.dao import PostDAO, CommentDAO, PhotoDAO, AlbumDAO, TodoDAO, UserDAO, HttpCacheDAO, SyncReport
+from app.database.locks import LockNotAcquired, advisory_lock
+from app.services.config import load_config
+from app.services.google_sheets_service import WriteStats, DiffStats, IncompleteSheetWrite, open_sheet_writer
+from app.services.pipeline import run_pipeline
+from app.services.single_flight import SingleFlight
+from app.services.schemas import PostValidate, CommentValidate, PhotoValidate, AlbumValidate, TodoValidate, UserValidate
+from app.services.utils import CacheValidators, RejectedItem, open_data_stream, fetch_pages, NotModified
+
+
+config = load_config()
+
+url = config.url
+SYNC_CONCURRENCY = config.sync_concurrency
+PAGE_SIZES = config.api_page_sizes
+PAGE_CONCURRENCY = config.api_page_concurrency
+DEFAULT_PAGE_CONCURRENCY = config.api_default_page_concurrency
+PIPELINE_QUEUE_SIZE = config.pipeline_queue_size
+SYNC_DEBOUNCE = config.sync_debounce
+SYNC_LOCK_MODE = config.sync_lock_mode
+SYNC_LOCK_TIMEOUT = config.sync_lock_timeout
+
+sync_flights = SingleFlight(SYNC_DEBOUNCE)
+
+USER_HEADERS = [
+    'id', 'name', 'username', 'email',
+    'address_street', 'address_suite', 'address_city', 'address_zipcode',
+    'geo_lat', 'geo_lng',
+    'phone', 'website',
+    'company_name', 'company_catch_phrase', 'company_bs'
+]
+
+
+def user_sheet_row(item: UserValidate) -> List[Any]:
+    """
+    Преобразует пользователя с вложенными адресом и компанией в плоскую строку таблицы.
+    """
+    return [
+        item.id, item.name, item.username, item.email,
+        item.address.street, item.address.suite, item.address.city, item.address.zipcode,
+        item.address.geo.lat, item.address.geo.lng,
+        item.phone, item.website,
+        item.company.name, item.company.catch_phrase, item.company.bs
+    ]
+
+
+class Resource(NamedTuple):
+    """
+    Описание ресурса API, загружаемого в базу данных и Google Sheets.
+    По этому описанию строятся кнопка бота, обработчик и конвейер загрузки,
+    так что новый ресурс добавляется одной записью в RESOURCES.
+
+    Атрибуты:
+        title (str): Название ресурса для кнопки и сообщений пользователю.
+        subject (str): Оборот для сообщений: 'о постах', 'об альбомах'.
+        endpoint (str): Путь ресурса в API.
+        validation_model: Pydantic-модель для валидации данных.
+        dao_class: Класс DAO для записи в базу данных.
+        sheet_name (str): Название листа Google Sheets.
+        headers (List[str]): Заголовки столбцов листа.
+        sheet_row (Optional[Callable]): Преобразование объекта в строку листа,
+            по умолчанию значения полей в порядке заголовков.
+    """
+    title: str
+    subject: str
+    endpoint: str
+    validation_model: Any
+    dao_class: Any
+    sheet_name: str
+    headers: List[str]
+    sheet_row: Optional[Callable[[Any], List[Any]]] = None
+
+
+@dataclass
+class ResourceReport:
+    """
+    Итог загрузки ресурса: запись в базу данных, валидация данных API, запись в Google Sheets
+    и ожидание блокировки ресурса.
+
+    Атрибуты:
+        database (SyncReport): Итог записи в базу данных.
+        rejected (List[RejectedItem]): Записи, не прошедшие валидацию.
+        sheets (Union[WriteStats, DiffStats, None]): Итог записи в Google Sheets.
+        lock_wait (float): Время ожидания блокировки ресурса в секундах.
+    """
+    database: SyncReport
+    rejected: List[RejectedItem] = field(default_factory=list)
+    sheets: Union[WriteStats, DiffStats, None] = None
+    lock_wait: float = 0.0
+
+    def __str__(self):
+        summary = str(self.database)
+        if self.rejected:
+            details = '; '.join(str(item) for item in self.rejected[:5])
+            summary += f'\nотклонено при валидации: {len(self.rejected)} ({details})'
+        if self.sheets is not None:
+            summary += f'\nGoogle Sheets: {self.sheets}'
+        if self.lock_wait >= 0.01:
+            summary += f'\nожидание блокировки: {self.lock_wait:.2f} с'
+        return summary
+
+
+RESOURCES = {
+    'posts': Resource(
+        'Посты', 'о постах', 'posts', PostValidate, PostDAO, 'Posts', ['user_id', 'id', 'title', 'body']
+    ),
+    'comments': Resource(
+        'Комментарии', 'о комментариях', 'comments', CommentValidate, CommentDAO, 'Comments',
+        ['post_id', 'id', 'name', 'email', 'body']
+    ),
+    'albums': Resource(
+        'Альбомы', 'об альбомах', 'albums', AlbumValidate, AlbumDAO, 'Albums', ['user_id', 'id', 'title']
+    ),
+    'photos': Resource(
+        'Фотографии', 'о фотографиях', 'photos', PhotoValidate, PhotoDAO, 'Photos',
+        ['album_id', 'id', 'title', 'url', 'thumbnail_url']
+    ),
+    'todos': Resource(
+        'Задачи', 'о задачах', 'todos', TodoValidate, TodoDAO, 'Todos', ['user_id', 'id', 'title', 'completed']
+    ),
+    'users': Resource(
+        'Пользователи', 'о пользователях', 'users', UserValidate, UserDAO, 'Users', USER_HEADERS, user_sheet_row
+    ),
+}
+
+
+async def run_resource_pipeline(resource: Resource, pages: AsyncIterable[List[Any]]) -> Tuple[int, ResourceReport]:
+    """
+    Записывает пачки провалидированных объектов ресурса в базу данных и в Google Sheets.
+
+    Загрузка из API, запись в базу данных и запись в лист выполняются одновременно как стадии
+    конвейера, связанные очередями размера PIPELINE_QUEUE_SIZE: пока одна пачка пишется в базу
+    данных, другая уже отправляется в Google Sheets, а следующая загружается из API.
+
+    Параметры:
+        resource (Resource): Описание загружаемого ресурса.
+        pages (AsyncIterable[List[Any]]): Пачки провалидированных объектов.
+
+    Возвращает:
+        Tuple[int, ResourceReport]: Количество полученных записей и итог загрузки.
+    """
+    headers = resource.headers
+    sheet_row = resource.sheet_row or (lambda item: [getattr(item, column) for column in headers])
+    writer = await open_sheet_writer(resource.sheet_name, headers)
+    count = 0
+
+    async def counted():
+        nonlocal count
+        async for items in pages:
+            count += len(items)
+            yield items
+
+    async def save_to_database(chunks: AsyncIterator[List[Any]]) -> SyncReport:
+        async def rows():
+            async for items in chunks:
+                yield [item.model_dump() for item in items]
+
+        async with AsyncSessionLocal() as session:
+            return await resource.dao_class(session).save_all(rows())
+
+    async def write_to_sheet(chunks: AsyncIterator[List[Any]]):
+        try:
+            async for items in chunks:
+                await writer.write([sheet_row(item) for item in items])
+            return await writer.close()
+        except BaseException:
+            # Конвейер отменил стадию: блоки, уже отправленные в фоне, отменяются до снятия блокировки ресурса.
+            await writer.abort()
+            raise
+
+    database, sheets = await run_pipeline(counted(), [save_to_database, write_to_sheet], PIPELINE_QUEUE_SIZE)
+    return count, ResourceReport(database, sheets=sheets)
+
+
+async def sync_resource(resource: Resource) -> Tuple[int, ResourceReport]:
+    """
+    Загружает ресурс в базу данных и Google Sheets, объединяя одновременные запросы.
+
+    Пока ресурс загружается, повторные запросы его загрузки (от других пользователей, повторные
+    нажатия кнопки, общая загрузка всех данных) не запускают еще одну замену таблицы,
+    а дожидаются текущей и получают ее итог. Итог успешной загрузки выдается повторным
+    запросам еще SYNC_DEBOUNCE секунд.
+
+    Между процессами (воркерами gunicorn) загрузка одного ресурса разделяется advisory-блокировкой
+    Postgres: в режиме SYNC_LOCK_MODE=wait загрузка ждет освобождения блокировки не дольше
+    SYNC_LOCK_TIMEOUT секунд, в режиме try сразу завершается, если ресурс загружает другой процесс.
+    Время ожидания блокировки попадает в итог загрузки.
+
+    Параметры:
+        resource (Resource): Описание загружаемого ресурса.
+
+    Возвращает:
+        Tuple[int, ResourceReport]: Количество полученных записей и итог загрузки.
+
+    Исключения:
+        NotModified: Если ресурс не изменился с прошлой загрузки.
+        LockNotAcquired: Если ресурс загружает другой процесс.
+        IncompleteSheetWrite: Если часть строк не удалось записать в лист; валидаторы
+            HTTP-кэша при этом не сохраняются, и следующая загрузка перезапишет лист.
+    """
+    return await sync_flights.run(resource.endpoint, lambda: _locked_sync_resource(resource))
+
+
+async def _locked_sync_resource(resource: Resource) -> Tuple[int, ResourceReport]:
+    """
+    Загружает ресурс, удерживая его advisory-блокировку.
+    """
+    wait = SYNC_LOCK_MODE == 'wait'
+    async with advisory_lock(f'sync:{resource.endpoint}', wait=wait, timeout=SYNC_LOCK_TIMEOUT) as lock:
+        count, report = await _sync_resource(resource)
+    report.lock_wait = lock.wait
+    return count, report
+
+
+async def _sync_resource(resource: Resource) -> Tuple[int, ResourceReport]:
+    """
+    Загружает ресурс из API потоково, пачками фиксированного размера, и записывает каждую пачку
+    в базу данных и в Google Sheets, не держа весь ответ в памяти.
+
+    Строки листа записываются блоками ограниченного размера одновременно с записью в базу данных;
+    в режиме SHEETS_SYNC_MODE=diff записываются только изменившиеся строки.
+
+    Запрос к API условный: если ресурс не изменился с прошлой успешной загрузки,
+    запись в базу данных и Google Sheets не выполняется. Ресурсы, для которых в API_PAGE_SIZES
+    задан размер страницы, загружаются постранично несколькими параллельными запросами.
+
+    Параметры:
+        resource (Resource): Описание загружаемого ресурса.
+
+    Возвращает:
+        Tuple[int, ResourceReport]: Количество полученных записей и итог загрузки.
+
+    Исключения:
+        NotModified: Если ресурс не изменился с прошлой загрузки.
+    """
+    api_url = f'{url}{resource.endpoint}'
+
+    page_size = PAGE_SIZES.get(resource.endpoint)
+    if page_size:
+        concurrency = PAGE_CONCURRENCY.get(resource.endpoint, DEFAULT_PAGE_CONCURRENCY)
+        rejected = []
+        pages = fetch_pages(api_url, resource.validation_model, page_size, concurrency, rejected=rejected)
+        count, report = await run_resource_pipeline(resource, pages)
+        report.rejected = rejected
+        return count, report
+
+    async with AsyncSessionLocal() as session:
+        saved = await HttpCacheDAO(session).get_validators(api_url)
+    validators = CacheValidators(*saved) if saved else None
+
+    async with open_data_stream(api_url, resource.validation_model, validators=validators) as stream:
+        count, report = await run_resource_pipeline(resource, stream.chunks())
+    async with AsyncSessionLocal() as session:
+        await HttpCacheDAO(session).save_validators(
+            api_url, stream.validators.etag, stream.validators.last_modified
+        )
+    report.rejected = stream.rejected
+    return count, report
+
+
+async def sync_all_resources(concurrency: int = SYNC_CONCURRENCY) -> List[Tuple[str, str, float]]:
+    """
+    Загружает все ресурсы одновременно, ограничивая число параллельных загрузок семафором,
+    так что общее время близко ко времени самого долгого ресурса, а не к сумме.
+
+    Параметры:
+        concurrency (int): Максимальное количество одновременно загружаемых ресурсов.
+
+    Возвращает:
+        List[Tuple[str, str, float]]: Для каждого ресурса название, результат и время загрузки в секундах.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(resource: Resource) -> Tuple[str, str, float]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                count, report = await sync_resource(resource)
+                result = f'{count} записей ({report})'
+            except NotModified:
+                result = 'без изменений'
+            except LockNotAcquired:
+                result = 'загружается другим процессом'
+            except IncompleteSheetWrite as error:
+                result = f'ошибка: не записано в лист {error.stats.failed_cells} ячеек'
+            except Exception:
+                result = 'ошибка'
+            return resource.title, result, time.perf_counter() - started
+
+    return await asyncio.gather(*(run(resource) for resource in RESOURCES.values()))
@@ -1,11 +1,34 @@
 import aiohttp
-from typing import List, Dict, Union
+import asyncio
+import codecs
+import json
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union
 import re
 
+from pydantic import TypeAdapter, ValidationError
 
+from app.services.config import load_config
+from app.services.http_client import get_http_session
+
+
+config = load_config()
+
+STREAM_CHUNK_SIZE = config.stream_chunk_size
+VALIDATION_STRICT = config.validation_strict
+READ_SIZE = 64 * 1024
+_ITEM_SEPARATOR = re.compile(r'[\s,]*')
+_VALUE_END = frozenset(' \t\r\n,]')
+
+
+@lru_cache(maxsize=4096)
 def to_snake_case(name: str) -> str:
     """
-    Преобразует строку из camelCase в snake_case.
+    Преобразует строку из camelCase в snake_case. Результат кэшируется,
+    так как набор ключей в ответах API небольшой и повторяется в каждой записи.
 
     Параметры:
         name (str): Строка в формате camelCase.
@@ -20,6 +43,9 @@ def convert_keys_to_snake_case(obj: Union[Dict, List]) -> Union[Dict, List]:
     """
     Рекурсивно преобразует ключи словаря или элементов списка из camelCase в snake_case.
 
+    Для валидации данных API преобразование не нужно: схемы читают ключи camelCase
+    через алиасы (см. CamelModel).
+
     Параметры:
         obj (Union[Dict, List]): Словарь или список для преобразования.
 
@@ -34,39 +60,337 @@ def convert_keys_to_snake_case(obj: Union[Dict, List]) -> Union[Dict, List]:
         return obj
 
 
-async def fetch_data_from_api(url: str) -> List[Dict]:
+@dataclass
+class RejectedItem:
+    """
+    Запись ответа API, не прошедшая валидацию.
+
+    Атрибуты:
+        index (int): Позиция записи в ответе API.
+        item_id (Any): Значение поля id записи, если его удалось прочитать.
+        error (str): Описание ошибок валидации.
+    """
+    index: int
+    item_id: Any
+    error: str
+
+    def __str__(self):
+        return f'#{self.item_id if self.item_id is not None else self.index}: {self.error}'
+
+
+@dataclass
+class ValidationResult:
+    """
+    Итог пакетной валидации.
+
+    Атрибуты:
+        items (List): Провалидированные объекты.
+        count (int): Количество записей во входных данных.
+        rejected (List[RejectedItem]): Отклоненные записи с описанием ошибок.
+    """
+    items: List
+    count: int
+    rejected: List[RejectedItem] = field(default_factory=list)
+
+
+@lru_cache(maxsize=None)
+def get_list_adapter(validation_model) -> TypeAdapter:
+    """
+    Возвращает закэшированный TypeAdapter для списка объектов модели.
+
+    Параметры:
+        validation_model: Pydantic-модель для валидации данных.
+
+    Возвращает:
+        TypeAdapter: Адаптер для типа List[validation_model].
+    """
+    return TypeAdapter(List[validation_model])
+
+
+def validate_batch(
+        data: Union[bytes, str, List[Dict]], validation_model, strict: bool = VALIDATION_STRICT, offset: int = 0
+) -> ValidationResult:
+    """
+    Валидирует весь массив записей одним вызовом TypeAdapter: тело ответа API - сразу из байтов,
+    без промежуточного json() и распаковки **kwargs для каждой записи.
+
+    Если часть записей не проходит валидацию, они отклоняются с описанием ошибок,
+    а остальные записи возвращаются, вместо того чтобы отбросить весь массив.
+
+    Параметры:
+        data (Union[bytes, str, List[Dict]]): JSON-массив в виде байтов или строки, либо список словарей.
+        validation_model: Pydantic-модель для валидации данных.
+        strict (bool): Строгий режим: без приведения типов (например, строки '1' к числу).
+        offset (int): Позиция первой записи в ответе API, для отчета об отклоненных записях.
+
+    Возвращает:
+        ValidationResult: Провалидированные объекты и отклоненные записи.
+
+    Исключения:
+        ValidationError: Если данные не являются массивом.
+    """
+    adapter = get_list_adapter(validation_model)
+    is_json = isinstance(data, (bytes, str))
+    try:
+        items = adapter.validate_json(data, strict=strict) if is_json else adapter.validate_python(data, strict=strict)
+        return ValidationResult(items=items, count=len(items))
+    except ValidationError as error:
+        errors: Dict[int, List[str]] = {}
+        for detail in error.errors():
+            if not detail['loc'] or not isinstance(detail['loc'][0], int):
+                raise
+            location = '.'.join(str(part) for part in detail['loc'][1:])
+            errors.setdefault(detail['loc'][0], []).append(f'{location}: {detail["msg"]}')
+
+    if is_json:
+        data = json.loads(data)
+    valid = [item for index, item in enumerate(data) if index not in errors]
+    rejected = [
+        RejectedItem(
+            index=offset + index,
+            item_id=data[index].get('id') if isinstance(data[index], dict) else None,
+            error='; '.join(messages),
+        )
+        for index, messages in sorted(errors.items())
+    ]
+    return ValidationResult(items=adapter.validate_python(valid, strict=strict), count=len(data), rejected=rejected)
+
+
+async def iter_json_array(response: aiohttp.ClientResponse) -> AsyncIterator[Dict]:
+    """
+    Инкрементально разбирает тело ответа, содержащее JSON-массив, и отдает его элементы
+    по мере чтения, не загружая весь ответ в память.
+
+    Параметры:
+        response (aiohttp.ClientResponse): Ответ API.
+
+    Возвращает:
+        AsyncIterator[Dict]: Элементы массива.
+
+    Исключения:
+        ValueError: Если тело ответа не является корректным JSON-массивом.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')()
+
+    async def pieces() -> AsyncIterator[Tuple[str, bool]]:
+        async for data in response.content.iter_chunked(READ_SIZE):
+            yield text_decoder.decode(data), False
+        yield text_decoder.decode(b'', final=True), True
+
+    buffer = ''
+    started = False
+
+    async for piece, final in pieces():
+        buffer += piece
+        position = 0
+        while True:
+            position = _ITEM_SEPARATOR.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('API response is not a JSON array')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            if not final and (end == len(buffer) or buffer[end] not in _VALUE_END):
+                # Значение не закончено разделителем: число могло оборваться на границе чтения
+                # ('2' из '23', '12' из '12.5'), поэтому оно разбирается после следующего чтения.
+                break
+            position = end
+            yield item
+        buffer = buffer[position:]
+
+    raise ValueError('API response ended before the JSON array was closed')
+
+
+class NotModified(Exception):
+    """
+    Ресурс не изменился с прошлой загрузки (API ответил 304 Not Modified).
+    """
+
+
+@dataclass
+class CacheValidators:
     """
-    Выполняет GET-запрос к API и возвращает данные с преобразованными ключами.
+    Валидаторы HTTP-кэша, полученные при прошлой загрузке ресурса.
+    """
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class CacheStats:
+    """
+    Счетчики условных запросов к API: hits - ответы 304, misses - полные ответы.
+    """
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+cache_stats = CacheStats()
+
+
+class DataStream:
+    """
+    Открытый ответ API, данные которого читаются потоково.
+
+    Атрибуты:
+        validators (CacheValidators): ETag и Last-Modified ответа для следующего условного запроса.
+        rejected (List[RejectedItem]): Записи, не прошедшие валидацию.
+
+    Методы:
+        chunks(): Отдает провалидированные пачки объектов по мере чтения ответа.
+    """
+    def __init__(self, response: aiohttp.ClientResponse, validation_model, chunk_size: int):
+        self.response = response
+        self.validation_model = validation_model
+        self.chunk_size = chunk_size
+        self.validators = CacheValidators(
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+        self.rejected: List[RejectedItem] = []
+
+    async def chunks(self) -> AsyncIterator[List]:
+        raw = []
+        offset = 0
+        async for item in iter_json_array(self.response):
+            raw.append(item)
+            if len(raw) >= self.chunk_size:
+                items = self._validate(raw, offset)
+                offset += len(raw)
+                raw = []
+                if items:
+                    yield items
+        if raw:
+            items = self._validate(raw, offset)
+            if items:
+                yield items
+
+    def _validate(self, raw: List[Dict], offset: int) -> List:
+        result = validate_batch(raw, self.validation_model, offset=offset)
+        self.rejected.extend(result.rejected)
+        return result.items
+
+
+@asynccontextmanager
+async def open_data_stream(
+        api_url: str,
+        validation_model,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+        validators: Optional[CacheValidators] = None
+) -> AsyncIterator[DataStream]:
+    """
+    Выполняет условный GET-запрос к API и открывает ответ для потокового чтения.
 
     Параметры:
-        url (str): URL API для выполнения запроса.
+        api_url (str): URL API для загрузки данных.
+        validation_model: Pydantic-модель для валидации данных.
+        chunk_size (int): Количество объектов в одной пачке.
+        session (Optional[aiohttp.ClientSession]): HTTP-сессия, по умолчанию общая сессия приложения.
+        validators (Optional[CacheValidators]): Валидаторы прошлой загрузки, отправляются
+            в заголовках If-None-Match и If-Modified-Since.
 
     Возвращает:
-        List[Dict]: Список словарей с данными, где ключи преобразованы в snake_case.
+        AsyncIterator[DataStream]: Открытый поток данных ответа.
 
     Исключения:
+        NotModified: Если ресурс не изменился с прошлой загрузки.
         Exception: Если запрос завершился с ошибкой.
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                snake_case_data = convert_keys_to_snake_case(data)
-                return snake_case_data
-            else:
-                raise Exception(f'API request failed with status {response.status}')
+    session = session or get_http_session()
+    headers = {}
+    if validators and validators.etag:
+        headers['If-None-Match'] = validators.etag
+    if validators and validators.last_modified:
+        headers['If-Modified-Since'] = validators.last_modified
 
+    async with session.get(api_url, headers=headers) as response:
+        if response.status == 304:
+            cache_stats.hits += 1
+            raise NotModified(api_url)
+        if response.status != 200:
+            raise Exception(f'API request failed with status {response.status}')
+        cache_stats.misses += 1
+        yield DataStream(response, validation_model, chunk_size)
 
-async def fetch_data(api_url: str, validation_model):
+
+async def fetch_pages(
+        api_url: str,
+        validation_model,
+        page_size: int,
+        concurrency: int,
+        session: Optional[aiohttp.ClientSession] = None,
+        rejected: Optional[List[RejectedItem]] = None
+) -> AsyncIterator[List]:
     """
-    Загружает данные из API и валидирует их с использованием модели.
+    Загружает постраничный ресурс (параметры _page и _limit) с ограниченным окном одновременных запросов.
+
+    Каждая страница валидируется сразу после получения, страницы отдаются по порядку.
+    Загрузка заканчивается на неполной странице, на последней странице по заголовку X-Total-Count
+    или на первой же странице, если API проигнорировал _page и _limit и вернул всю коллекцию.
 
     Параметры:
         api_url (str): URL API для загрузки данных.
         validation_model: Pydantic-модель для валидации данных.
+        page_size (int): Количество объектов на странице.
+        concurrency (int): Максимальное количество одновременно загружаемых страниц.
+        session (Optional[aiohttp.ClientSession]): HTTP-сессия, по умолчанию общая сессия приложения.
+        rejected (Optional[List[RejectedItem]]): Список, в который добавляются отклоненные записи.
 
     Возвращает:
-        List: Список объектов, валидированных с помощью модели.
+        AsyncIterator[List]: Страницы объектов, валидированных с помощью модели.
+
+    Исключения:
+        Exception: Если запрос страницы завершился с ошибкой.
     """
-    data = await fetch_data_from_api(api_url)
-    return [validation_model(**item) for item in data]
+    session = session or get_http_session()
+    total_pages = None
+
+    async def fetch_page(page: int) -> ValidationResult:
+        nonlocal total_pages
+        async with session.get(api_url, params={'_page': page, '_limit': page_size}) as response:
+            if response.status != 200:
+                raise Exception(f'API request failed with status {response.status}')
+            total = response.headers.get('X-Total-Count')
+            if total is not None:
+                total_pages = -(-int(total) // page_size)
+            body = await response.read()
+        return validate_batch(body, validation_model, offset=(page - 1) * page_size)
+
+    pending = deque()
+    next_page = 1
+    try:
+        while True:
+            while len(pending) < concurrency and (total_pages is None or next_page <= total_pages):
+                pending.append(asyncio.create_task(fetch_page(next_page)))
+                next_page += 1
+            if not pending:
+                return
+            result = await pending.popleft()
+            if rejected is not None:
+                rejected.extend(result.rejected)
+            if result.items:
+                yield result.items
+            # Страница больше page_size значит, что API не поддерживает постраничную загрузку
+            # и вернул всю коллекцию: следующие страницы повторили бы ее.
+            if result.count != page_size:
+                return
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
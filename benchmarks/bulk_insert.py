@@ -0,0 +1,59 @@
+"""
+Сравнение скорости записи в базу данных: построчный create() против bulk_create().
+
+Запуск (из корня проекта, при настроенном .env и примененных миграциях):
+
+    python -m benchmarks.bulk_insert 5000
+
+Внимание: скрипт очищает таблицу photos.
+"""
+import asyncio
+import sys
+import time
+
+from app.database.dao import PhotoDAO
+from app.database.db import AsyncSessionLocal
+from app.database.models import Photo
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            'album_id': i // 50 + 1,
+            'id': i + 1,
+            'title': f'photo {i}',
+            'url': f'https://via.placeholder.com/600/{i:06x}',
+            'thumbnail_url': f'https://via.placeholder.com/150/{i:06x}',
+        }
+        for i in range(count)
+    ]
+
+
+async def bench_create(rows: list) -> float:
+    async with AsyncSessionLocal() as session:
+        repository = PhotoDAO(session)
+        await repository.delete_all()
+        started = time.perf_counter()
+        for row in rows:
+            await repository.create(Photo(**row))
+        return time.perf_counter() - started
+
+
+async def bench_bulk_create(rows: list) -> float:
+    async with AsyncSessionLocal() as session:
+        repository = PhotoDAO(session)
+        await repository.delete_all()
+        started = time.perf_counter()
+        await repository.bulk_create(rows)
+        return time.perf_counter() - started
+
+
+async def main(count: int):
+    rows = make_rows(count)
+    for name, bench in (('create', bench_create), ('bulk_create', bench_bulk_create)):
+        elapsed = await bench(rows)
+        print(f'{name:<12} {count} строк за {elapsed:.2f} с ({count / elapsed:,.0f} строк/с)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
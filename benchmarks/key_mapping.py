@@ -0,0 +1,67 @@
+"""
+Сравнение стоимости нормализации ключей ответа API перед валидацией:
+рекурсивное преобразование ключей регулярным выражением против чтения camelCase через алиасы схем.
+
+Запуск (из корня проекта):
+
+    python -m benchmarks.key_mapping 5000
+"""
+import re
+import sys
+import timeit
+
+from app.services.schemas import PhotoValidate, UserValidate
+from app.services.utils import convert_keys_to_snake_case
+
+
+def legacy_to_snake_case(name: str) -> str:
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+def legacy_convert(obj):
+    if isinstance(obj, dict):
+        return {legacy_to_snake_case(k): legacy_convert(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_convert(elem) for elem in obj]
+    return obj
+
+
+def make_photos(count: int) -> list:
+    return [
+        {'albumId': i // 50 + 1, 'id': i + 1, 'title': f'photo {i}',
+         'url': f'https://via.placeholder.com/600/{i:06x}', 'thumbnailUrl': f'https://via.placeholder.com/150/{i:06x}'}
+        for i in range(count)
+    ]
+
+
+def make_users(count: int) -> list:
+    return [
+        {'id': i + 1, 'name': 'Leanne Graham', 'username': 'Bret', 'email': 'Sincere@april.biz',
+         'address': {'street': 'Kulas Light', 'suite': 'Apt. 556', 'city': 'Gwenborough', 'zipcode': '92998-3874',
+                     'geo': {'lat': '-37.3159', 'lng': '81.1496'}},
+         'phone': '1-770-736-8031 x56442', 'website': 'hildegard.org',
+         'company': {'name': 'Romaguera-Crona', 'catchPhrase': 'Multi-layered client-server neural-net',
+                     'bs': 'harness real-time e-markets'}}
+        for i in range(count)
+    ]
+
+
+def report(name: str, seconds: float, count: int):
+    print(f'{name:<40} {seconds * 1000:8.1f} мс ({count / seconds:,.0f} записей/с)')
+
+
+def main(count: int, repeat: int = 5):
+    for title, data, model in (('photos', make_photos(count), PhotoValidate), ('users', make_users(count), UserValidate)):
+        print(f'{title}, {count} записей:')
+        cases = (
+            ('только преобразование: regex', lambda: legacy_convert(data)),
+            ('только преобразование: кэш ключей', lambda: convert_keys_to_snake_case(data)),
+            ('было: regex + model(**item)', lambda: [model(**item) for item in legacy_convert(data)]),
+            ('стало: алиасы, model_validate(item)', lambda: [model.model_validate(item) for item in data]),
+        )
+        for name, case in cases:
+            report(name, min(timeit.repeat(case, number=1, repeat=repeat)), count)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
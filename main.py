@@ -3,6 +3,9 @@ from aiogram.webhook.aiohttp_server import SimpleRequestHandler
 from aiohttp import web
 from app.handlers.handler import register_handlers
 from app.services.config import load_config
+from app.services.http_client import init_http_session, close_http_session
+from app.services.job_queue import init_job_queue, close_job_queue
+from app.services.periodic_sync import init_periodic_sync, close_periodic_sync
 
 
 async def on_startup(app):
@@ -15,6 +18,9 @@ async def on_startup(app):
     Действия:
         - Загружает конфигурацию приложения.
         - Создает экземпляры бота и диспетчера.
+        - Создает общую HTTP-сессию для запросов к API.
+        - Запускает обработчики очереди фоновых задач синхронизации.
+        - Запускает периодическую загрузку ресурсов по расписанию.
         - Регистрирует обработчики событий.
         - Устанавливает вебхук для бота.
         - Сохраняет объекты бота, диспетчера и конфигурации в приложение.
@@ -26,6 +32,9 @@ async def on_startup(app):
     app['bot'] = bot
     app['dp'] = dp
     app['config'] = config
+    app['http_session'] = await init_http_session(config)
+    app['job_queue'] = await init_job_queue(bot, config)
+    app['periodic_sync'] = await init_periodic_sync(config)
 
     await bot.set_webhook(config.webhook_url + '/webhook')
 
@@ -40,9 +49,14 @@ async def on_shutdown(app):
         app (Application): Экземпляр веб-приложения.
 
     Действия:
+        - Останавливает периодическую загрузку и обработчики очереди задач.
         - Закрывает сессию бота.
+        - Закрывает общую HTTP-сессию для запросов к API.
     """
+    await close_periodic_sync()
+    await close_job_queue()
     await app['bot'].session.close()
+    await close_http_session()
 
 
 def create_app():